@@ -422,8 +422,6 @@ export default function VesselMap() {
 
   // ---- WEBSOCKET CONNECTION (LIVE UPDATES) ----
 
-  const lastUpdateRef = useRef(0);
-
 useEffect(() => {
   try {
     // --- DIRECT SOCKET INITIALIZATION (no fetch!) ---
@@ -454,30 +452,42 @@ useEffect(() => {
       console.log('📡 initial_data from server:', data);
     });
 
-    socketRef.current.on('vessel_update', (data) => {
-      const { mmsi, position } = data;
-      
-      // Throttle updates to prevent excessive re-renders
-      const now = Date.now();
-      if (now - lastUpdateRef.current < 100) return; // Max 10 updates/second
-      lastUpdateRef.current = now;
+    // Server batches live positions every ~50ms as parallel arrays:
+    // { mmsi: [...], lat: [...], lon: [...], ... } (row i of each array is one vessel)
+    socketRef.current.on('vessel_batch_update', (batch) => {
+      const mmsis = batch?.mmsi || [];
+      if (mmsis.length === 0) return;
+      const fields = Object.keys(batch).filter(field => field !== 'mmsi');
       
       setVessels(prev => {
-        const index = prev.findIndex(v => v.mmsi === mmsi);
-        if (index >= 0) {
-          // Only update if position actually changed
-          const existing = prev[index];
-          if (existing.lat === position.lat && existing.lon === position.lon) {
-            return prev; // No change, return same reference
+        let updated = null;
+        const indexByMmsi = new Map(prev.map((v, i) => [v.mmsi, i]));
+        
+        for (let row = 0; row < mmsis.length; row++) {
+          const mmsi = mmsis[row];
+          const position = {};
+          for (const field of fields) {
+            position[field] = batch[field][row];
+          }
+          const index = indexByMmsi.get(mmsi);
+          if (index !== undefined) {
+            // Only update if position actually changed
+            const existing = (updated || prev)[index];
+            if (existing.lat === position.lat && existing.lon === position.lon) {
+              continue;
+            }
+            // Copy the array once per batch, not per vessel
+            if (!updated) updated = [...prev];
+            updated[index] = { ...existing, ...position };
+          } else {
+            // New vessel - add to end
+            if (!updated) updated = [...prev];
+            indexByMmsi.set(mmsi, updated.length);
+            updated.push({ mmsi, ...position });
           }
-          // Create new array reference only for updated vessel
-          const updated = [...prev];
-          updated[index] = { ...existing, ...position };
-          return updated;
-        } else {
-          // New vessel - add to end
-          return [...prev, { mmsi, ...position }];
         }
+        
+        return updated || prev; // No change, return same reference
       });
     });
 
@@ -6,17 +6,67 @@ and tracks their real-time positions via AISStream WebSocket.
 
 import websocket
 import json
+import mmap
+import os
+import random
+import socket
 import sqlite3
 import threading
 import time
 from pathlib import Path
 from datetime import datetime
 
+# orjson is optional - fall back to the stdlib parser if it isn't installed
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+
+def _max_connections_from_env():
+    """Read AIS_MAX_CONNECTIONS; exit with a clear message unless it is an integer >= 1."""
+    value = os.environ.get('AIS_MAX_CONNECTIONS', '').strip()
+    if not value:
+        return None
+    try:
+        limit = int(value)
+    except ValueError:
+        limit = 0
+    if limit < 1:
+        raise SystemExit(f"ERROR: AIS_MAX_CONNECTIONS must be a whole number >= 1 (got {value!r}). "
+                         "Unset it to open one socket per batch.")
+    return limit
+
+
 # Configuration
 DB_NAME = "vessel_static_data.db"
 API_KEY_FILE = "config/aisstream_keys"
 WEBSOCKET_URL = "wss://stream.aisstream.io/v0/stream"
 MAX_MMSI_PER_CONNECTION = 50  # AISStream limit
+# Optional cap on concurrent sockets (AIS_MAX_CONNECTIONS). Unset means one socket
+# per batch, so every vessel is tracked continuously. With a cap, batches beyond it
+# share sockets and take turns, so each vessel is only tracked part of the time.
+MAX_CONNECTIONS = _max_connections_from_env()
+SUBSCRIPTION_ROTATE_SECONDS = 60  # How long each shared batch stays subscribed
+
+# Socket options for each AIS connection: disable Nagle so small frames
+# aren't delayed, and enlarge the receive buffer for bursts of updates
+SOCKET_OPTIONS = (
+    (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+    (socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024),
+)
+
+# Limits how many batches can be mid-handshake at once, replacing the
+# fixed sleep between tracker starts
+CONNECT_GATE = threading.Semaphore(5)
+
+# Position printout template, built once instead of per message
+_POS_FMT = ("\n[POSITION] Batch %d\n"
+            "  MMSI: %s (%s)\n"
+            "  Position: %.6f, %.6f\n"
+            "  Speed: %s knots, Course: %s°\n"
+            "  Time: %s")
 
 # Global API key
 API_KEY = None
@@ -28,12 +78,18 @@ def load_api_key():
         project_root = Path(__file__).parent.parent
         api_file_path = project_root / API_KEY_FILE
         
-        with open(api_file_path, 'r') as f:
-            lines = f.readlines()
-            for line in reversed(lines):
-                line = line.strip()
-                if line and not line.startswith('#'):
-                    return line
+        # mmap can't map an empty file - nothing to find there anyway
+        if os.stat(api_file_path).st_size > 0:
+            with open(api_file_path, 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    # Walk lines from the end so only the tail is touched
+                    end = len(mm)
+                    while end > 0:
+                        start = mm.rfind(b"\n", 0, end) + 1
+                        line = mm[start:end].strip()
+                        if line and not line.startswith(b'#'):
+                            return line.decode()
+                        end = start - 1
         
         raise ValueError("No API key found in config/aisstream_keys")
     except FileNotFoundError:
@@ -115,49 +171,151 @@ def create_mmsi_batches(mmsi_list, batch_size=MAX_MMSI_PER_CONNECTION):
     return batches
 
 
+def assign_batches_to_connections(batches, max_connections=MAX_CONNECTIONS):
+    """
+    Distribute MMSI batches round-robin over at most max_connections sockets.
+    
+    AISStream replaces the filter when a new subscription is sent on an open
+    connection, so a socket carrying several batches cycles through them.
+    
+    Args:
+        batches: List of MMSI batches
+        max_connections: Maximum number of concurrent WebSocket connections
+            (None for one connection per batch)
+    
+    Returns:
+        List of batch groups (each group is a list of batches for one socket)
+    """
+    if max_connections is None:
+        return [[batch] for batch in batches]
+    groups = [[] for _ in range(min(len(batches), max_connections))]
+    for i, batch in enumerate(batches):
+        groups[i % len(groups)].append(batch)
+    return groups
+
+
+def rotation_coverage(groups):
+    """
+    Describe the tracking duty cycle when connections rotate subscriptions.
+    
+    Args:
+        groups: Batch groups from assign_batches_to_connections()
+    
+    Returns:
+        Summary string, or None if every batch has its own connection
+    """
+    longest = max(len(group) for group in groups)
+    if longest == 1:
+        return None
+    shortest = min(len(group) for group in groups)
+    if shortest == longest:
+        share = f"{100 / longest:.0f}%"
+    else:
+        share = f"{100 / longest:.0f}-{100 / shortest:.0f}%"
+    max_gap = (longest - 1) * SUBSCRIPTION_ROTATE_SECONDS
+    return (f"each vessel is tracked {share} of the time "
+            f"({SUBSCRIPTION_ROTATE_SECONDS}s on, gaps of up to {max_gap}s in its position history)")
+
+
+# Fallback timestamp cache, refreshed at most once per second
+_cached_ts_sec = 0
+_cached_ts = ""
+
+
+def _iso_now():
+    """Current UTC time as ISO string, cached at one-second granularity."""
+    global _cached_ts_sec, _cached_ts
+    now = int(time.time())
+    if now != _cached_ts_sec:
+        _cached_ts = datetime.utcfromtimestamp(now).isoformat()
+        _cached_ts_sec = now
+    return _cached_ts
+
+
+class PositionUpdate:
+    """Lightweight record for a single PositionReport (no per-instance dict)."""
+    
+    __slots__ = ("mmsi", "lat", "lon", "sog", "cog", "ts", "name")
+    
+    def __init__(self, mmsi, lat, lon, sog, cog, ts, name):
+        self.mmsi = mmsi
+        self.lat = lat
+        self.lon = lon
+        self.sog = sog
+        self.cog = cog
+        self.ts = ts
+        self.name = name
+    
+    @classmethod
+    def from_message(cls, data):
+        """
+        Build a PositionUpdate from a decoded AISStream PositionReport.
+        
+        Returns:
+            PositionUpdate, or None if required sections are missing
+        """
+        try:
+            meta = data["MetaData"]
+            pos = data["Message"]["PositionReport"]
+        except (KeyError, TypeError):
+            return None
+        
+        return cls(
+            meta.get("MMSI"),
+            meta.get("latitude"),
+            meta.get("longitude"),
+            pos.get("Sog"),  # Speed Over Ground
+            pos.get("Cog"),  # Course Over Ground
+            meta.get("time_utc") or _iso_now(),
+            meta.get("ShipName", "Unknown")
+        )
+
+
 class VesselTracker:
-    """Handles WebSocket connection for tracking a batch of vessels."""
+    """
+    Handles WebSocket connection for tracking one or more batches of vessels.
     
-    def __init__(self, batch_id, mmsi_batch, api_key):
+    With several batches the connection rotates its subscription between
+    them every SUBSCRIPTION_ROTATE_SECONDS.
+    """
+    
+    def __init__(self, batch_id, mmsi_batches, api_key):
         self.batch_id = batch_id
-        self.mmsi_batch = mmsi_batch
+        self.mmsi_batches = mmsi_batches
+        self.batch_index = 0
+        self.mmsi_batch = mmsi_batches[0]
         self.api_key = api_key
         self.ws_app = None
         self.thread = None
         self.running = False
         self.reconnect_delay = 5
         self.max_reconnect_delay = 60
+        self._gate_held = False
         
     def on_message(self, ws, message):
         """Handle incoming WebSocket messages."""
         try:
-            data = json.loads(message)
+            data = _loads(message)
             
             # Check for errors
             if "error" in data or "Error" in data:
                 print(f"[Batch {self.batch_id}] ERROR: {data}")
                 return
             
+            # Connection is healthy again - reset the reconnect backoff
+            if self.reconnect_delay != 5:
+                self.reconnect_delay = 5
+            
             msg_type = data.get("MessageType")
             
             # Process PositionReport
             if msg_type == "PositionReport":
-                metadata = data.get("MetaData", {})
-                position_data = data.get("Message", {}).get("PositionReport", {})
-                
-                mmsi = metadata.get("MMSI")
-                lat = metadata.get("latitude")
-                lon = metadata.get("longitude")
-                sog = position_data.get("Sog")  # Speed Over Ground
-                cog = position_data.get("Cog")  # Course Over Ground
-                timestamp = metadata.get("time_utc", datetime.utcnow().isoformat())
-                ship_name = metadata.get("ShipName", "Unknown")
+                pos = PositionUpdate.from_message(data)
+                if pos is None or pos.lat is None or pos.lon is None:
+                    return
                 
-                print(f"\n[POSITION] Batch {self.batch_id}")
-                print(f"  MMSI: {mmsi} ({ship_name})")
-                print(f"  Position: {lat:.6f}, {lon:.6f}")
-                print(f"  Speed: {sog} knots, Course: {cog}°")
-                print(f"  Time: {timestamp}")
+                print(_POS_FMT % (self.batch_id, pos.mmsi, pos.name,
+                                  pos.lat, pos.lon, pos.sog, pos.cog, pos.ts))
             
             # Process VoyageReport (if available)
             elif msg_type == "VoyageReport":
@@ -194,7 +352,12 @@ class VesselTracker:
     def on_open(self, ws):
         """Handle WebSocket open and send subscription."""
         print(f"[Batch {self.batch_id}] Connected - Tracking {len(self.mmsi_batch)} vessels")
+        self._release_gate()
         
+        self._subscribe(ws)
+    
+    def _subscribe(self, ws):
+        """Send the subscription for the current MMSI batch."""
         # Convert MMSI list to the format AISStream expects
         # Each MMSI should be a string in the array
         mmsi_strings = [str(mmsi) for mmsi in self.mmsi_batch]
@@ -206,18 +369,43 @@ class VesselTracker:
         }
         
         ws.send(json.dumps(subscribe_message))
-        print(f"[Batch {self.batch_id}] Subscription sent")
+        print(f"[Batch {self.batch_id}] Subscription sent "
+              f"({self.batch_index + 1}/{len(self.mmsi_batches)})")
     
     def start(self):
         """Start the WebSocket connection in a separate thread."""
         self.running = True
         self.thread = threading.Thread(target=self._run_forever, daemon=True)
         self.thread.start()
+        
+        if len(self.mmsi_batches) > 1:
+            print(f"[Batch {self.batch_id}] Rotating {len(self.mmsi_batches)} subscriptions every "
+                  f"{SUBSCRIPTION_ROTATE_SECONDS}s - each covered 1/{len(self.mmsi_batches)} of the time")
+            threading.Thread(target=self._rotate_forever, daemon=True).start()
+    
+    def _rotate_forever(self):
+        """Cycle the subscription through this connection's batches."""
+        while self.running:
+            time.sleep(SUBSCRIPTION_ROTATE_SECONDS)
+            
+            ws_app = self.ws_app
+            if not self.running or ws_app is None or ws_app.sock is None or not ws_app.sock.connected:
+                continue
+            
+            self.batch_index = (self.batch_index + 1) % len(self.mmsi_batches)
+            self.mmsi_batch = self.mmsi_batches[self.batch_index]
+            try:
+                self._subscribe(ws_app)
+            except Exception as e:
+                print(f"[Batch {self.batch_id}] Re-subscribe failed: {e}")
     
     def _run_forever(self):
         """Run WebSocket with auto-reconnect."""
         while self.running:
             try:
+                CONNECT_GATE.acquire()
+                self._gate_held = True
+                
                 self.ws_app = websocket.WebSocketApp(
                     WEBSOCKET_URL,
                     on_open=self.on_open,
@@ -226,17 +414,37 @@ class VesselTracker:
                     on_close=self.on_close
                 )
                 
-                self.ws_app.run_forever()
+                # Ping regularly so dead peers are detected sooner than TCP keepalive
+                self.ws_app.run_forever(
+                    sockopt=SOCKET_OPTIONS,
+                    ping_interval=20,
+                    ping_timeout=10
+                )
+                
+                # Connection failed before on_open - free the slot
+                self._release_gate()
                 
                 if self.running:
-                    print(f"[Batch {self.batch_id}] Reconnecting in {self.reconnect_delay}s...")
-                    time.sleep(self.reconnect_delay)
+                    delay = self._backoff_delay()
+                    print(f"[Batch {self.batch_id}] Reconnecting in {delay:.1f}s...")
+                    time.sleep(delay)
                     self.reconnect_delay = min(self.reconnect_delay * 2, self.max_reconnect_delay)
                 
             except Exception as e:
                 print(f"[Batch {self.batch_id}] Exception: {e}")
+                self._release_gate()
                 if self.running:
-                    time.sleep(self.reconnect_delay)
+                    time.sleep(self._backoff_delay())
+    
+    def _release_gate(self):
+        """Release this tracker's CONNECT_GATE slot if it holds one."""
+        if self._gate_held:
+            self._gate_held = False
+            CONNECT_GATE.release()
+    
+    def _backoff_delay(self):
+        """Current reconnect delay plus jitter so batches don't reconnect in lock-step."""
+        return self.reconnect_delay + random.uniform(0, self.reconnect_delay * 0.3)
     
     def stop(self):
         """Stop the WebSocket connection."""
@@ -266,21 +474,34 @@ def main():
         
         # Create batches
         batches = create_mmsi_batches(mmsi_list)
-        print(f"Created {len(batches)} tracking batch(es)")
-        print(f"  (Max {MAX_MMSI_PER_CONNECTION} MMSIs per connection)\n")
+        groups = assign_batches_to_connections(batches)
+        print(f"Created {len(batches)} tracking batch(es) on {len(groups)} connection(s)")
+        if MAX_CONNECTIONS is None:
+            print(f"  (Max {MAX_MMSI_PER_CONNECTION} MMSIs per connection)\n")
+        else:
+            print(f"  (Max {MAX_MMSI_PER_CONNECTION} MMSIs per subscription, "
+                  f"max {MAX_CONNECTIONS} connections from AIS_MAX_CONNECTIONS)\n")
+        
+        coverage = rotation_coverage(groups)
+        if coverage:
+            print(f"WARNING: {len(batches)} batches share {len(groups)} connection(s), "
+                  f"so subscriptions rotate and coverage is partial:")
+            print(f"  {coverage}")
+            print("  Unset AIS_MAX_CONNECTIONS (or raise it) for continuous tracking.\n")
         
         # Create and start trackers
         trackers = []
-        for i, batch in enumerate(batches, 1):
-            tracker = VesselTracker(i, batch, API_KEY)
+        for i, group in enumerate(groups, 1):
+            tracker = VesselTracker(i, group, API_KEY)
             tracker.start()
             trackers.append(tracker)
-            time.sleep(1)  # Stagger connection starts
         
         print(f"\n{'='*70}")
         print("TRACKING ACTIVE")
         print(f"{'='*70}")
-        print(f"Monitoring {len(mmsi_list)} vessels across {len(batches)} connection(s)")
+        print(f"Monitoring {len(mmsi_list)} vessels across {len(groups)} connection(s)")
+        if coverage:
+            print(f"PARTIAL COVERAGE: {coverage}")
         print("Press Ctrl+C to stop")
         print(f"{'='*70}\n")
         
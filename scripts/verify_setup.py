@@ -19,14 +19,14 @@ for mmsi in test_mmsis:
 conn = sqlite3.connect('vessel_static_data.db')
 c = conn.cursor()
 
-c.execute('SELECT COUNT(*) FROM vessels_static')
-total = c.fetchone()[0]
-
-c.execute('SELECT COUNT(*) FROM vessels_static WHERE flag_state IS NOT NULL')
-with_flag = c.fetchone()[0]
-
-c.execute('SELECT COUNT(*) FROM vessels_static WHERE length >= 100 AND (ship_type IS NULL OR ship_type NOT IN (71, 72))')
-trackable = c.fetchone()[0]
+# Single pass over the table for all counts
+c.execute('''
+    SELECT COUNT(*),
+           COALESCE(SUM(flag_state IS NOT NULL), 0),
+           COALESCE(SUM(length >= 100 AND (ship_type IS NULL OR ship_type NOT IN (71, 72))), 0)
+    FROM vessels_static
+''')
+total, with_flag, trackable = c.fetchone()
 
 print(f"\n2. Database Status:")
 print(f"   Total vessels: {total}")
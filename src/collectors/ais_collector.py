@@ -25,6 +25,13 @@ from datetime import datetime
 from pathlib import Path
 from typing import Optional, Dict, Any
 
+# Native JSON decoder for the per-message hot path (falls back to stdlib)
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 # Handle both direct script execution and module import
 try:
     from .mmsi_mid_lookup import get_flag_state
@@ -301,7 +308,7 @@ def process_ais_message(ws, message: str) -> None:
         if _message_count % STATS_MESSAGE_INTERVAL == 0:
             print_stats()
         
-        data = json.loads(message)
+        data = _json_loads(message)
         
         # Check for server errors
         if "error" in data or "Error" in data:
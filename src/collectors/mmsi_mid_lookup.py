@@ -3,6 +3,8 @@ MMSI MID (Maritime Identification Digits) to Flag State Lookup
 The first 3 digits of an MMSI identify the vessel's flag state.
 """
 
+import functools
+
 MID_TO_COUNTRY = {
     "201": "Albania", "202": "Andorra", "203": "Austria", "204": "Azores",
     "205": "Belgium", "206": "Belarus", "207": "Bulgaria", "208": "Vatican",
@@ -114,6 +116,10 @@ def get_flag_state(mmsi):
     if mmsi is None:
         return None
     
+    # Fast path: regular 9-digit integer MMSI, MID is the leading 3 digits
+    if type(mmsi) is int and 100_000_000 <= mmsi < 1_000_000_000:
+        return _flag_state_for_mid(mmsi // 1_000_000)
+    
     mmsi_str = str(mmsi)
     
     # MMSI should be 9 digits
@@ -126,6 +132,12 @@ def get_flag_state(mmsi):
     return MID_TO_COUNTRY.get(mid)
 
 
+@functools.lru_cache(maxsize=1024)
+def _flag_state_for_mid(mid):
+    """Cached flag state lookup by numeric MID (at most ~1000 distinct values)."""
+    return MID_TO_COUNTRY.get(str(mid))
+
+
 def get_mid(mmsi):
     """
     Extract MID (Maritime Identification Digits) from MMSI.
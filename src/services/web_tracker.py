@@ -3,15 +3,24 @@ Real-time Web-Based Vessel Tracker with Map Visualization
 Displays tracked vessels on an interactive map with live updates.
 """
 
-from flask import Flask, render_template, jsonify, request, send_from_directory
+from flask import Flask, render_template, jsonify, request, send_from_directory, g, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_socketio import SocketIO, emit
 import websocket
 import json
 import sqlite3
+import asyncio
+import atexit
 import threading
 import time
+import functools
+import contextlib
+import logging
+import queue
+import random
+import re
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
 import requests  # For proxying to PC ML service
 import sys
 import os
@@ -24,6 +33,68 @@ except Exception:
     TextBlob = None
     TEXTBLOB_AVAILABLE = False
 
+# Optional fast JSON (AIS stream parsing and API responses); stdlib json otherwise
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+# Optional asyncio WebSocket client: runs every AISStream connection on one event loop
+try:
+    import websockets
+    WEBSOCKETS_AVAILABLE = True
+except ImportError:
+    websockets = None
+    WEBSOCKETS_AVAILABLE = False
+
+# Optional production WSGI server (threaded worker); Werkzeug dev server otherwise
+try:
+    from gunicorn.app.base import BaseApplication
+    GUNICORN_AVAILABLE = True
+except ImportError:
+    BaseApplication = object
+    GUNICORN_AVAILABLE = False
+
+
+def _loads(data):
+    """Decode a JSON message (str or bytes)."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _dumps(obj):
+    """Encode obj as a JSON str."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider that serializes jsonify() responses with orjson.
+    
+    Output matches Flask's default provider: keys are sorted (sort_keys), and
+    dates/datetimes are passed to self.default, which formats them as HTTP dates.
+    """
+    
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=self.default, option=option).decode()
+        except TypeError:
+            # Anything orjson can't handle goes through the stdlib path
+            return super().dumps(obj, **kwargs)
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 # Add project root to path for imports
 _project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(_project_root))
@@ -31,14 +102,157 @@ sys.path.insert(0, str(_project_root))
 # Configuration
 DB_NAME = "vessel_static_data.db"
 
-# Cache for match-stats (refresh every 5 minutes)
-_match_stats_cache = None
-_match_stats_cache_time = 0
-_match_stats_cache_ttl = 300  # 5 minutes
+# Lifetime of cached aggregate responses (match-stats, companies)
+AGGREGATE_CACHE_TTL = 30  # seconds
+
+
+# Prepared statements kept per connection (keyed by SQL text), so fixed query strings skip re-parsing
+STATEMENT_CACHE_SIZE = 256
+
+# Database pages are memory-mapped (shared by all connections through the OS page cache)
+MMAP_SIZE = 1024 * 1024 * 1024  # 1GB
+
+
+def open_db(db_path, timeout=30, **kwargs):
+    """Open a SQLite connection with WAL and the standard performance PRAGMAs."""
+    kwargs.setdefault('cached_statements', STATEMENT_CACHE_SIZE)
+    conn = sqlite3.connect(str(db_path), timeout=timeout, **kwargs)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')  # Safe with WAL, avoids fsync per commit
+    conn.execute(f'PRAGMA busy_timeout={int(timeout * 1000)}')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    conn.execute('PRAGMA cache_size=-65536')  # 64MB page cache
+    conn.execute(f'PRAGMA mmap_size={MMAP_SIZE}')
+    return conn
+
+
+def open_ro_db(db_path, timeout=30):
+    """Open a read-only SQLite connection for API queries."""
+    uri = Path(db_path).resolve().as_uri() + '?mode=ro'
+    conn = sqlite3.connect(uri, uri=True, timeout=timeout, check_same_thread=False,
+                           cached_statements=STATEMENT_CACHE_SIZE)
+    conn.execute('PRAGMA query_only=1')
+    conn.execute('PRAGMA cache_size=-65536')
+    conn.execute(f'PRAGMA mmap_size={MMAP_SIZE}')
+    conn.create_function('ship_type_name', 1, get_ship_type_name, deterministic=True)
+    return conn
+
+
+# Long-lived connections per database file, shared by all request threads
+POOL_SIZE = 8
+POOL_TIMEOUT = 30  # Seconds to wait for a free connection
+
+
+class ConnectionPool:
+    """Bounded pool of reusable SQLite connections to one database file."""
+    
+    def __init__(self, db_path, readonly=False, size=POOL_SIZE):
+        self.db_path = db_path
+        self.readonly = readonly
+        self.size = size
+        self._idle = queue.LifoQueue(maxsize=size)  # LIFO keeps the warmest page cache in use
+        self._created = 0
+        self._lock = threading.Lock()
+    
+    def _connect(self):
+        if self.readonly:
+            return open_ro_db(self.db_path)
+        return open_db(self.db_path, check_same_thread=False)
+    
+    def _get(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        
+        with self._lock:
+            can_create = self._created < self.size
+            if can_create:
+                self._created += 1
+        if can_create:
+            try:
+                return self._connect()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        
+        try:
+            return self._idle.get(timeout=POOL_TIMEOUT)
+        except queue.Empty:
+            raise sqlite3.OperationalError(f"No free database connection for {self.db_path}")
+    
+    @contextlib.contextmanager
+    def acquire(self):
+        """Borrow a connection for the duration of a with-block."""
+        conn = self._get()
+        try:
+            yield conn
+        finally:
+            try:
+                # Don't hand an open transaction to the next borrower
+                conn.rollback()
+                self._idle.put_nowait(conn)
+            except Exception:
+                conn.close()
+                with self._lock:
+                    self._created -= 1
+    
+    def close(self):
+        """Close every idle connection (borrowed ones are closed on return by their owner)."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            conn.close()
+            with self._lock:
+                self._created -= 1
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path, readonly=False):
+    """Return the shared connection pool for db_path (created on first use)."""
+    key = (str(db_path), readonly)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = ConnectionPool(db_path, readonly=readonly)
+    return pool
+
+
+def close_pools():
+    """Close and forget all pools, e.g. before forking server workers."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+def get_ro_conn(db_path):
+    """
+    Return a pooled read-only connection to db_path for the current request.
+    
+    The connection is held until the request's app context ends and then goes
+    back to the pool, so callers must not close it.
+    """
+    conns = g.setdefault('ro_conns', {})
+    key = str(db_path)
+    conn = conns.get(key)
+    if conn is None:
+        stack = g.setdefault('db_stack', contextlib.ExitStack())
+        conn = conns[key] = stack.enter_context(get_pool(db_path, readonly=True).acquire())
+    return conn
 
 
 def ensure_econowind_column(conn):
-    """Ensure the econowind_fit_score column exists before running queries."""
+    """Ensure the econowind_fit_score column exists; returns False if the table is missing."""
     try:
         cursor = conn.cursor()
         cursor.execute("PRAGMA table_info(eu_mrv_emissions)")
@@ -48,13 +262,14 @@ def ensure_econowind_column(conn):
                 "ALTER TABLE eu_mrv_emissions ADD COLUMN econowind_fit_score INTEGER DEFAULT 0"
             )
             conn.commit()
+        return True
     except sqlite3.OperationalError:
         # Table may not exist yet (e.g., before MRV import). Ignore so API can fail gracefully.
-        pass
+        return False
 
 
 def ensure_technical_fit_score_column(conn):
-    """Ensure the technical_fit_score column exists in vessels_static table."""
+    """Ensure the technical_fit_score column exists in vessels_static; returns False if the table is missing."""
     try:
         cursor = conn.cursor()
         cursor.execute("PRAGMA table_info(vessels_static)")
@@ -64,9 +279,35 @@ def ensure_technical_fit_score_column(conn):
                 "ALTER TABLE vessels_static ADD COLUMN technical_fit_score REAL DEFAULT NULL"
             )
             conn.commit()
+        return True
     except sqlite3.OperationalError:
         # Table may not exist yet. Ignore so API can fail gracefully.
-        pass
+        return False
+
+
+# Databases whose added columns are known to exist; checked once (normally by init_db)
+_schema_checked = set()
+_schema_lock = threading.Lock()
+
+
+def ensure_schema(conn, db_path):
+    """
+    Add the econowind/technical-fit columns once per database.
+    
+    After the first successful check this is a set lookup, so routes can call
+    it without a PRAGMA round-trip. A database is only marked checked once both
+    tables exist, so the columns are still added after a later MRV import.
+    """
+    key = str(db_path)
+    if key in _schema_checked:
+        return
+    with _schema_lock:
+        if key in _schema_checked:
+            return
+        mrv_ok = ensure_econowind_column(conn)
+        static_ok = ensure_technical_fit_score_column(conn)
+        if mrv_ok and static_ok:
+            _schema_checked.add(key)
 
 
 API_KEY_FILE = "config/aisstream_keys"
@@ -89,15 +330,98 @@ app = Flask(__name__,
             static_folder=str(static_dir))
 app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
 app.config['SECRET_KEY'] = 'ais-tracker-secret'
+if ORJSON_AVAILABLE:
+    app.json = OrjsonProvider(app)
 # Configure Socket.IO to work with /ships/ path prefix
 socketio = SocketIO(app, cors_allowed_origins="*", path="/ships/socket.io")
 
+@app.teardown_appcontext
+def release_db_connections(exc):
+    """Return connections borrowed through get_ro_conn() to their pools."""
+    stack = g.pop('db_stack', None)
+    if stack is not None:
+        stack.close()
+
+
+# Cached route responses: {(view name, full path): ((body, mimetype), expires_at)}
+_response_cache = {}
+RESPONSE_CACHE_MAX_ENTRIES = 256
+
+
+def ttl_cache(seconds):
+    """
+    Cache a GET route's successful response for the given number of seconds.
+    
+    Entries are keyed by the request path including the query string, so
+    identical requests within the window are served without touching the database.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            key = (view.__name__, request.full_path)
+            now = time.time()
+            
+            cached = _response_cache.get(key)
+            if cached and cached[1] > now:
+                body, mimetype = cached[0]
+                return app.response_class(body, mimetype=mimetype)
+            
+            response = app.make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                if len(_response_cache) >= RESPONSE_CACHE_MAX_ENTRIES:
+                    # Drop expired entries (or everything, if none expired) to bound memory
+                    expired = [k for k, (_, expires) in list(_response_cache.items()) if expires <= now]
+                    for k in expired or list(_response_cache):
+                        _response_cache.pop(k, None)
+                _response_cache[key] = ((response.get_data(), response.mimetype), now + seconds)
+            return response
+        return wrapper
+    return decorator
+
+
 # Global state
 API_KEY = None
-vessel_positions = {}  # {mmsi: {lat, lon, sog, cog, timestamp, name, ...}}
+# Live positions: {mmsi: {lat, lon, sog, cog, timestamp, name, ...}}
+# Writers only ever store a fresh dict per MMSI (entries are never mutated in place),
+# and readers work from vessel_positions_snapshot() or single .get() lookups, which
+# are atomic under the GIL, so request threads need no lock.
+vessel_positions = {}
 vessel_static_data = {}  # {mmsi: {name, length, type, flag, ...}}
+_vessel_base_cache = []  # Map-ready static fields per tracked vessel, built in get_filtered_vessels()
+vessel_static_tuple = {}  # {mmsi: (name, length, flag_state)} - the fields on_message copies into each position
+_EMPTY_STATIC = ('Unknown', None, 'Unknown')  # Defaults for untracked MMSIs
 tracking_active = False
 
+# Live position updates waiting to be pushed to browsers, keyed by MMSI.
+# Flushed as a single 'vessel_batch_update' event every UPDATE_FLUSH_INTERVAL
+# seconds, or immediately once MAX_PENDING_UPDATES vessels are queued.
+UPDATE_FLUSH_INTERVAL = 0.05
+MAX_PENDING_UPDATES = 500
+_pending_updates = {}
+_flush_lock = threading.Lock()
+
+# Per-vessel fields sent in 'vessel_batch_update', one parallel list per field
+POSITION_FIELDS = ('lat', 'lon', 'sog', 'cog', 'timestamp', 'name', 'length', 'flag_state')
+
+# Single long-lived connection for position history writes, used by the
+# writer thread and serialized with _writer_lock
+_writer_conn = None
+_writer_lock = threading.Lock()
+
+# Position rows waiting to be written. Trackers only enqueue; the writer thread
+# drains up to INSERT_BATCH_SIZE rows (or whatever arrived within
+# INSERT_FLUSH_INTERVAL seconds) and writes them in one transaction.
+INSERT_FLUSH_INTERVAL = 1.0
+INSERT_BATCH_SIZE = 500
+_position_queue = queue.Queue()
+
+
+# Running count of saved positions; a summary line is printed every POSITION_LOG_EVERY
+POSITION_LOG_EVERY = 1000
+_positions_saved = 0
+
+logger = logging.getLogger(__name__)
+
 
 # Ship type mapping
 SHIP_TYPE_NAMES = {
@@ -152,6 +476,7 @@ SHIP_TYPE_NAMES = {
 }
 
 
+@functools.lru_cache(maxsize=256)
 def get_ship_type_name(ship_type_code):
     """Convert ship type code to human-readable name."""
     if ship_type_code is None:
@@ -190,10 +515,7 @@ def get_filtered_vessels():
     project_root = Path(__file__).parent.parent.parent
     db_path = project_root / DB_NAME
     
-    conn = None
-    try:
-        conn = sqlite3.connect(db_path, timeout=30)
-        conn.execute('PRAGMA journal_mode=WAL')
+    with get_pool(db_path, readonly=True).acquire() as conn:
         cursor = conn.cursor()
         
         # Try query with gross_tonnage first
@@ -227,9 +549,6 @@ def get_filtered_vessels():
             cursor.execute(query)
             vessels = cursor.fetchall()
             has_gross_tonnage = False
-    finally:
-        if conn:
-            conn.close()
     
     # Store static data
     for vessel in vessels:
@@ -253,9 +572,407 @@ def get_filtered_vessels():
             'gross_tonnage': gross_tonnage  # From EU MRV emissions
         }
     
+    # Static part of each /api/vessels entry; positions are merged in per request
+    global _vessel_base_cache
+    _vessel_base_cache = [
+        {
+            'mmsi': mmsi,
+            'name': static['name'],
+            'length': static['length'],
+            'flag_state': static['flag_state'],
+            'ship_type': static['ship_type'],
+            'detailed_ship_type': static.get('detailed_ship_type'),
+            'wind_assisted': static.get('wind_assisted', 0),
+            'gross_tonnage': static.get('gross_tonnage')
+        }
+        for mmsi, static in vessel_static_data.items()
+    ]
+    
+    # Pre-flattened per-message lookup for the AIS stream hot path
+    global vessel_static_tuple
+    vessel_static_tuple = {
+        mmsi: (static['name'], static['length'], static['flag_state'])
+        for mmsi, static in vessel_static_data.items()
+    }
+    
     return [vessel[0] for vessel in vessels]
 
 
+def get_writer_conn():
+    """
+    Return the shared position-history writer connection, opening it on first use.
+    
+    Callers must hold _writer_lock.
+    """
+    global _writer_conn
+    if _writer_conn is None:
+        # Autocommit mode: write_positions() manages its own BEGIN IMMEDIATE/COMMIT
+        _writer_conn = open_db(project_root / DB_NAME, check_same_thread=False, isolation_level=None)
+        _writer_conn.execute('PRAGMA wal_autocheckpoint=1000')
+    return _writer_conn
+
+
+def write_positions(batch):
+    """Insert position rows into vessel_positions in a single transaction."""
+    global _positions_saved
+    if not batch:
+        return
+    
+    try:
+        with _writer_lock:
+            conn = get_writer_conn()
+            # Take the write lock up front instead of upgrading mid-transaction
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.executemany('''
+                    INSERT INTO vessel_positions (mmsi, latitude, longitude, sog, cog, timestamp)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', batch)
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+            
+            previous = _positions_saved
+            _positions_saved += len(batch)
+            if _positions_saved // POSITION_LOG_EVERY > previous // POSITION_LOG_EVERY:
+                print(f"[Position DB] {_positions_saved:,} positions saved")
+    except Exception as e:
+        print(f"[Position DB] Error saving {len(batch)} positions: {e}")
+
+
+def flush_position_buffer():
+    """Write every position queued so far (registered with atexit by start_tracking)."""
+    batch = []
+    try:
+        while True:
+            batch.append(_position_queue.get_nowait())
+    except queue.Empty:
+        pass
+    write_positions(batch)
+
+
+def _insert_flusher():
+    """Writer thread: batches queued positions by size or time and writes them."""
+    while True:
+        batch = [_position_queue.get()]  # Block until there is something to write
+        deadline = time.monotonic() + INSERT_FLUSH_INTERVAL
+        while len(batch) < INSERT_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_position_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        write_positions(batch)
+
+
+def _existing_db_paths():
+    """Database files the routes may read from (data/ copy and project root)."""
+    candidates = [project_root / "data" / DB_NAME, project_root / DB_NAME]
+    return [p for p in candidates if p.exists()]
+
+
+# Indexes backing the hot API queries, created once by init_db()
+STARTUP_INDEXES = [
+    # Route queries use the covering index from ensure_position_epoch(); both supersede ix_positions_mmsi_ts
+    'DROP INDEX IF EXISTS ix_positions_mmsi_ts',
+    # Recent-vessel lists (ORDER BY last_updated DESC) with length/ship_type filters checked in the index
+    'CREATE INDEX IF NOT EXISTS idx_vessels_lastupd_len ON vessels_static(last_updated DESC, length, ship_type)',
+    'DROP INDEX IF EXISTS ix_vessels_static_last_updated',
+    'CREATE INDEX IF NOT EXISTS ix_vessels_static_ship_type_length ON vessels_static(ship_type, length)',
+    # AIS <-> EU MRV join and top-emitter ordering
+    'CREATE INDEX IF NOT EXISTS idx_vessels_static_imo ON vessels_static(imo)',
+    # eu_mrv_emissions.imo is UNIQUE, so its automatic index already serves the join
+    'DROP INDEX IF EXISTS idx_mrv_imo',
+    'CREATE INDEX IF NOT EXISTS idx_mrv_co2_imo ON eu_mrv_emissions(total_co2_emissions DESC, imo)',
+    'DROP INDEX IF EXISTS idx_mrv_co2',
+]
+
+# Database paths where the vessels_fts search index is available
+_fts_ready = set()
+
+
+def ensure_vessels_fts(conn):
+    """
+    Ensure the vessels_fts full-text index over vessels_static exists and is kept in sync.
+    
+    Returns:
+        True if the index is usable, False if FTS5 or vessels_static is unavailable
+    """
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='vessels_fts'")
+        exists = cursor.fetchone() is not None
+        
+        if exists:
+            # Rebuild indexes created before mmsi was stored alongside the text columns
+            cursor.execute('PRAGMA table_info(vessels_fts)')
+            if 'mmsi' not in {row[1] for row in cursor.fetchall()}:
+                cursor.executescript('''
+                    DROP TRIGGER IF EXISTS vessels_fts_ai;
+                    DROP TRIGGER IF EXISTS vessels_fts_ad;
+                    DROP TRIGGER IF EXISTS vessels_fts_au;
+                    DROP TABLE vessels_fts;
+                ''')
+                exists = False
+        
+        cursor.executescript('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS vessels_fts USING fts5(
+                name, signatory_company, mmsi UNINDEXED,
+                content='vessels_static', content_rowid='rowid',
+                tokenize='unicode61'
+            );
+            CREATE TRIGGER IF NOT EXISTS vessels_fts_ai AFTER INSERT ON vessels_static BEGIN
+                INSERT INTO vessels_fts(rowid, name, signatory_company, mmsi)
+                VALUES (new.rowid, new.name, new.signatory_company, new.mmsi);
+            END;
+            CREATE TRIGGER IF NOT EXISTS vessels_fts_ad AFTER DELETE ON vessels_static BEGIN
+                INSERT INTO vessels_fts(vessels_fts, rowid, name, signatory_company, mmsi)
+                VALUES ('delete', old.rowid, old.name, old.signatory_company, old.mmsi);
+            END;
+            CREATE TRIGGER IF NOT EXISTS vessels_fts_au AFTER UPDATE OF name, signatory_company, mmsi ON vessels_static BEGIN
+                INSERT INTO vessels_fts(vessels_fts, rowid, name, signatory_company, mmsi)
+                VALUES ('delete', old.rowid, old.name, old.signatory_company, old.mmsi);
+                INSERT INTO vessels_fts(rowid, name, signatory_company, mmsi)
+                VALUES (new.rowid, new.name, new.signatory_company, new.mmsi);
+            END;
+        ''')
+        
+        # Index existing rows the first time the table is created
+        if not exists:
+            cursor.execute("INSERT INTO vessels_fts(vessels_fts) VALUES ('rebuild')")
+        conn.commit()
+        return True
+    except sqlite3.OperationalError as e:
+        print(f"[DB init] Full-text search unavailable: {e}")
+        return False
+
+
+# Database paths where the vessel_latest table is maintained
+_latest_ready = set()
+
+
+def ensure_vessel_latest(conn):
+    """
+    Ensure the vessel_latest table (newest position per MMSI) exists.
+    
+    A trigger on vessel_positions keeps it current for every writer (this
+    service and the collector scripts), so readers avoid MAX(timestamp) scans.
+    
+    Returns:
+        True if the table is usable, False if vessel_positions is unavailable
+    """
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='vessel_latest'")
+        exists = cursor.fetchone() is not None
+        
+        cursor.executescript('''
+            CREATE TABLE IF NOT EXISTS vessel_latest (
+                mmsi INTEGER PRIMARY KEY,
+                latitude REAL NOT NULL,
+                longitude REAL NOT NULL,
+                sog REAL,
+                cog REAL,
+                timestamp TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS ix_vessel_latest_timestamp ON vessel_latest(timestamp);
+            CREATE TRIGGER IF NOT EXISTS vessel_latest_ai AFTER INSERT ON vessel_positions BEGIN
+                INSERT INTO vessel_latest (mmsi, latitude, longitude, sog, cog, timestamp)
+                VALUES (new.mmsi, new.latitude, new.longitude, new.sog, new.cog, new.timestamp)
+                ON CONFLICT(mmsi) DO UPDATE SET
+                    latitude = excluded.latitude,
+                    longitude = excluded.longitude,
+                    sog = excluded.sog,
+                    cog = excluded.cog,
+                    timestamp = excluded.timestamp
+                WHERE excluded.timestamp >= vessel_latest.timestamp;
+            END;
+        ''')
+        
+        # Seed from existing history the first time
+        if not exists:
+            cursor.execute('''
+                INSERT OR REPLACE INTO vessel_latest (mmsi, latitude, longitude, sog, cog, timestamp)
+                SELECT mmsi, latitude, longitude, sog, cog, MAX(timestamp)
+                FROM vessel_positions
+                GROUP BY mmsi
+            ''')
+        conn.commit()
+        return True
+    except sqlite3.OperationalError as e:
+        conn.rollback()
+        print(f"[DB init] Latest-position table unavailable: {e}")
+        return False
+
+
+# Top companies by fleet size, materialized into company_stats for /api/companies
+_company_stats_ready = set()
+COMPANY_STATS_REFRESH_INTERVAL = 60  # seconds
+COMPANY_STATS_LIMIT = 50
+
+
+def refresh_company_stats(conn):
+    """
+    Rebuild the company_stats table from vessels_static.
+    
+    The table is replaced in one transaction, so readers see either the
+    previous snapshot or the new one.
+    
+    Returns:
+        True if the table was refreshed, False if vessels_static is unavailable
+    """
+    try:
+        cursor = conn.cursor()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS company_stats (
+                company TEXT PRIMARY KEY,
+                vessel_count INTEGER NOT NULL,
+                avg_length REAL,
+                max_length INTEGER,
+                updated_at REAL NOT NULL
+            )
+        ''')
+        cursor.execute('DELETE FROM company_stats')
+        cursor.execute('''
+            INSERT INTO company_stats (company, vessel_count, avg_length, max_length, updated_at)
+            SELECT signatory_company, COUNT(*), AVG(length), MAX(length), ?
+            FROM vessels_static
+            WHERE signatory_company IS NOT NULL AND signatory_company != ''
+            GROUP BY signatory_company
+            ORDER BY COUNT(*) DESC
+            LIMIT ?
+        ''', (time.time(), COMPANY_STATS_LIMIT))
+        conn.commit()
+        return True
+    except sqlite3.OperationalError as e:
+        conn.rollback()
+        print(f"[DB init] Company stats unavailable: {e}")
+        return False
+
+
+# Database paths where vessel_positions has the ts_epoch column and its route index
+_epoch_ready = set()
+
+
+def ensure_position_epoch(conn):
+    """
+    Ensure vessel_positions has an integer ts_epoch column and a covering route index on it.
+    
+    ts_epoch is a VIRTUAL generated column (Unix seconds parsed from the first
+    19 characters of timestamp), so every writer - this service and the
+    collector scripts - gets it without changing its INSERTs, and both the
+    'T' and space-separated timestamp forms compare correctly as integers.
+    Without generated-column support (SQLite < 3.31) the text-timestamp
+    index is kept instead. Once the column exists, the database can no longer
+    be opened by SQLite < 3.31 (older sqlite3 CLIs and DB browsers).
+    
+    Returns:
+        True if route queries can filter on ts_epoch
+    """
+    try:
+        cursor = conn.cursor()
+        # Generated columns are hidden from table_info, so use table_xinfo
+        cursor.execute("PRAGMA table_xinfo(vessel_positions)")
+        columns = {row[1] for row in cursor.fetchall()}
+        if not columns:
+            return False
+        if 'ts_epoch' not in columns:
+            cursor.execute('''
+                ALTER TABLE vessel_positions ADD COLUMN ts_epoch INTEGER
+                GENERATED ALWAYS AS (CAST(strftime('%s', substr(timestamp, 1, 19)) AS INTEGER)) VIRTUAL
+            ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS ix_positions_route_epoch
+            ON vessel_positions(mmsi, ts_epoch, latitude, longitude, sog, cog, timestamp)
+        ''')
+        cursor.execute('DROP INDEX IF EXISTS ix_positions_route')
+        conn.commit()
+        return True
+    except sqlite3.OperationalError as e:
+        conn.rollback()
+        print(f"[DB init] Epoch timestamps unavailable, using text timestamps: {e}")
+        try:
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_positions_route ON vessel_positions(mmsi, timestamp, latitude, longitude, sog, cog)')
+            conn.commit()
+        except sqlite3.OperationalError:
+            pass  # Table not present in this copy of the database
+        return False
+
+
+def init_db():
+    """One-time schema setup run at startup (columns and indexes used by the API routes)."""
+    for db_path in _existing_db_paths():
+        try:
+            with get_pool(db_path).acquire() as conn:
+                ensure_schema(conn, db_path)
+                for statement in STARTUP_INDEXES:
+                    try:
+                        conn.execute(statement)
+                    except sqlite3.OperationalError as e:
+                        # Table may not exist in this copy of the database
+                        print(f"[DB init] {db_path}: {e}")
+                conn.commit()
+                if ensure_vessels_fts(conn):
+                    _fts_ready.add(str(db_path))
+                if ensure_vessel_latest(conn):
+                    _latest_ready.add(str(db_path))
+                if ensure_position_epoch(conn):
+                    _epoch_ready.add(str(db_path))
+                if refresh_company_stats(conn):
+                    _company_stats_ready.add(str(db_path))
+                
+                # Refresh planner statistics for the new indexes. The static/MRV tables are
+                # analyzed in full so STAT4 builds also record histograms for join ordering;
+                # position history is sampled, so this stays fast on large databases.
+                for table, limit in (('vessels_static', 0), ('eu_mrv_emissions', 0), ('vessel_positions', 1000)):
+                    try:
+                        conn.execute(f'PRAGMA analysis_limit={limit}')
+                        conn.execute(f'ANALYZE {table}')
+                    except sqlite3.OperationalError:
+                        pass  # Table not present in this copy of the database
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"[DB init] {db_path}: {e}")
+
+
+# How often the planner statistics are refreshed while the server runs
+DB_OPTIMIZE_INTERVAL = 6 * 3600  # 6 hours
+
+
+def optimize_db():
+    """Refresh planner statistics for tables that changed significantly (PRAGMA optimize)."""
+    for db_path in _existing_db_paths():
+        try:
+            with get_pool(db_path).acquire() as conn:
+                conn.execute('PRAGMA analysis_limit=1000')
+                conn.execute('PRAGMA optimize')
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"[DB optimize] {db_path}: {e}")
+
+
+def _db_maintenance():
+    """Background thread that keeps statistics current as position history grows."""
+    while True:
+        time.sleep(DB_OPTIMIZE_INTERVAL)
+        optimize_db()
+
+
+def _company_stats_refresher():
+    """Background thread that rebuilds company_stats every COMPANY_STATS_REFRESH_INTERVAL seconds."""
+    while True:
+        time.sleep(COMPANY_STATS_REFRESH_INTERVAL)
+        for db_path in list(_company_stats_ready):
+            try:
+                with get_pool(db_path).acquire() as conn:
+                    refresh_company_stats(conn)
+            except sqlite3.Error as e:
+                print(f"[Company stats] {db_path}: {e}")
+
+
 class VesselTrackerWebSocket:
     """Handles WebSocket connection for tracking vessels."""
     
@@ -266,16 +983,29 @@ class VesselTrackerWebSocket:
         self.ws_app = None
         self.thread = None
         self.running = False
+        self.reconnect_delay = 5
+        self.max_reconnect_delay = 60
+        
+        # Batch and key never change, so the subscription is encoded once and resent on reconnect
+        self._subscribe_payload = _dumps({
+            "APIKey": api_key,
+            "FiltersShipMMSI": [str(mmsi) for mmsi in mmsi_batch],
+            "BoundingBoxes": [[[90, -180], [-90, 180]]]
+        })
         
     def on_message(self, ws, message):
         """Handle incoming WebSocket messages."""
         try:
-            data = json.loads(message)
+            data = _loads(message)
             
             if "error" in data or "Error" in data:
                 print(f"[Batch {self.batch_id}] ERROR: {data}")
                 return
             
+            # Connection is healthy again - reset the reconnect backoff
+            if self.reconnect_delay != 5:
+                self.reconnect_delay = 5
+            
             msg_type = data.get("MessageType")
             
             if msg_type == "PositionReport":
@@ -290,44 +1020,33 @@ class VesselTrackerWebSocket:
                 timestamp = metadata.get("time_utc", datetime.utcnow().isoformat())
                 
                 if mmsi and lat and lon:
-                    # Update vessel position
-                    vessel_positions[mmsi] = {
+                    name, length, flag_state = vessel_static_tuple.get(mmsi, _EMPTY_STATIC)
+                    
+                    # Publish a new position entry (never mutated after this store)
+                    position = {
                         'lat': lat,
                         'lon': lon,
                         'sog': sog,
                         'cog': cog,
                         'timestamp': timestamp,
-                        'name': vessel_static_data.get(mmsi, {}).get('name', 'Unknown'),
-                        'length': vessel_static_data.get(mmsi, {}).get('length'),
-                        'flag_state': vessel_static_data.get(mmsi, {}).get('flag_state', 'Unknown')
+                        'name': name,
+                        'length': length,
+                        'flag_state': flag_state
                     }
+                    vessel_positions[mmsi] = position
                     
-                    # Save position to history database
-                    conn = None
-                    try:
-                        project_root = Path(__file__).parent.parent.parent
-                        db_path = project_root / DB_NAME
-                        conn = sqlite3.connect(db_path, timeout=5)
-                        conn.execute('PRAGMA journal_mode=WAL')
-                        cursor = conn.cursor()
-                        cursor.execute('''
-                            INSERT INTO vessel_positions (mmsi, latitude, longitude, sog, cog, timestamp)
-                            VALUES (?, ?, ?, ?, ?, ?)
-                        ''', (mmsi, lat, lon, sog, cog, timestamp))
-                        conn.commit()
-                    except Exception as e:
-                        print(f"[Position DB] Error saving: {e}")
-                    finally:
-                        if conn:
-                            conn.close()
+                    # Queue position for the history writer thread
+                    _position_queue.put_nowait((mmsi, lat, lon, sog, cog, timestamp))
                     
-                    # Emit to all connected web clients
-                    socketio.emit('vessel_update', {
-                        'mmsi': mmsi,
-                        'position': vessel_positions[mmsi]
-                    })
+                    # Queue for the next batched emit to web clients
+                    with _flush_lock:
+                        _pending_updates[mmsi] = position
+                        flush_now = len(_pending_updates) >= MAX_PENDING_UPDATES
+                    if flush_now:
+                        emit_pending_updates()
                     
-                    print(f"[Position] {mmsi} - {vessel_positions[mmsi]['name']}: {lat:.4f}, {lon:.4f}")
+                    # Per-message detail only when debug logging is enabled (summary comes from the writer)
+                    logger.debug("[Position] %s - %s: %.4f, %.4f", mmsi, name, lat, lon)
                 
         except Exception as e:
             print(f"[Batch {self.batch_id}] Error: {e}")
@@ -345,18 +1064,32 @@ class VesselTrackerWebSocket:
     def on_open(self, ws):
         """Handle WebSocket open and send subscription."""
         print(f"[Batch {self.batch_id}] Connected - Tracking {len(self.mmsi_batch)} vessels")
-        
-        mmsi_strings = [str(mmsi) for mmsi in self.mmsi_batch]
-        
-        subscribe_message = {
-            "APIKey": self.api_key,
-            "FiltersShipMMSI": mmsi_strings,
-            "BoundingBoxes": [[[90, -180], [-90, 180]]]
-        }
-        
-        ws.send(json.dumps(subscribe_message))
+        ws.send(self._subscribe_payload)
         print(f"[Batch {self.batch_id}] Subscription sent")
     
+    async def run_async(self, start_delay=0):
+        """Run the connection on the shared asyncio loop with auto-reconnect."""
+        self.running = True
+        await asyncio.sleep(start_delay)
+        while self.running:
+            try:
+                async with websockets.connect(WEBSOCKET_URL, ping_interval=20, ping_timeout=10) as ws:
+                    print(f"[Batch {self.batch_id}] Connected - Tracking {len(self.mmsi_batch)} vessels")
+                    # Awaited, so a failed subscription is reported and triggers a reconnect
+                    await ws.send(self._subscribe_payload)
+                    print(f"[Batch {self.batch_id}] Subscription sent")
+                    async for message in ws:
+                        self.on_message(ws, message)
+            except Exception as e:
+                self.on_error(None, e)
+            self.on_close(None, None, None)
+            
+            if self.running:
+                delay = self._backoff_delay()
+                print(f"[Batch {self.batch_id}] Reconnecting in {delay:.1f}s...")
+                await asyncio.sleep(delay)
+                self.reconnect_delay = min(self.reconnect_delay * 2, self.max_reconnect_delay)
+    
     def start(self):
         """Start the WebSocket connection."""
         self.running = True
@@ -375,13 +1108,65 @@ class VesselTrackerWebSocket:
                     on_close=self.on_close
                 )
                 self.ws_app.run_forever()
-                
-                if self.running:
-                    time.sleep(5)
-                    
             except Exception as e:
                 print(f"[Batch {self.batch_id}] Exception: {e}")
-                time.sleep(5)
+            
+            # Same jittered, doubling backoff after a disconnect or an exception
+            if self.running:
+                delay = self._backoff_delay()
+                print(f"[Batch {self.batch_id}] Reconnecting in {delay:.1f}s...")
+                time.sleep(delay)
+                self.reconnect_delay = min(self.reconnect_delay * 2, self.max_reconnect_delay)
+    
+    def _backoff_delay(self):
+        """Current reconnect delay plus jitter so batches don't reconnect in lock-step."""
+        return self.reconnect_delay + random.uniform(0, self.reconnect_delay * 0.3)
+
+
+def _run_trackers_async(trackers):
+    """Drive all tracker connections from one event loop (runs in a single daemon thread)."""
+    async def run_all():
+        await asyncio.gather(*(tracker.run_async(start_delay=i) for i, tracker in enumerate(trackers)))
+    
+    asyncio.run(run_all())
+
+
+def vessel_positions_snapshot():
+    """Point-in-time copy of vessel_positions that is safe to iterate while trackers keep updating."""
+    return vessel_positions.copy()
+
+
+def columnar_positions(batch):
+    """
+    Pack {mmsi: position} into {'mmsi': [...], 'lat': [...], ...} parallel lists.
+    
+    Field names are sent once per batch instead of once per vessel, and MMSIs
+    stay integers rather than becoming object keys.
+    """
+    positions = list(batch.values())
+    columns = {'mmsi': list(batch)}
+    for field in POSITION_FIELDS:
+        columns[field] = [position[field] for position in positions]
+    return columns
+
+
+def emit_pending_updates():
+    """Send all queued position updates to web clients in one event."""
+    global _pending_updates
+    with _flush_lock:
+        batch, _pending_updates = _pending_updates, {}
+    if batch:
+        socketio.emit('vessel_batch_update', columnar_positions(batch))
+
+
+def _update_flusher():
+    """Background task that flushes queued position updates periodically."""
+    while True:
+        socketio.sleep(UPDATE_FLUSH_INTERVAL)
+        try:
+            emit_pending_updates()
+        except Exception as e:
+            print(f"[Updates] Error emitting batch: {e}")
 
 
 # Flask routes - Serving React frontend
@@ -417,6 +1202,42 @@ def serve_frontend(path):
     return send_from_directory(str(frontend_dist), 'index.html')
 
 
+# Latest position per vessel seen in the last 6 hours, optionally inside a viewport
+RECENT_POSITIONS_QUERY = '''
+    SELECT p.mmsi, p.latitude, p.longitude, p.sog, p.cog, MAX(p.timestamp) as timestamp
+    FROM vessel_positions p
+    WHERE p.timestamp >= datetime('now', '-6 hours')
+      AND (:min_lat IS NULL OR (p.latitude >= :min_lat AND p.latitude <= :max_lat
+                                AND p.longitude >= :min_lon AND p.longitude <= :max_lon))
+    GROUP BY p.mmsi
+    ORDER BY timestamp DESC
+    LIMIT :limit
+'''
+
+# Same result from the vessel_latest table: one row per vessel, no GROUP BY over history
+LATEST_POSITIONS_QUERY = '''
+    SELECT mmsi, latitude, longitude, sog, cog, timestamp
+    FROM vessel_latest
+    WHERE timestamp >= datetime('now', '-6 hours')
+      AND (:min_lat IS NULL OR (latitude >= :min_lat AND latitude <= :max_lat
+                                AND longitude >= :min_lon AND longitude <= :max_lon))
+    ORDER BY timestamp DESC
+    LIMIT :limit
+'''
+
+# Static details for a JSON array of MMSIs, with the map's optional type filters
+RECENT_VESSEL_INFO_QUERY = '''
+    SELECT v.mmsi, v.name, v.ship_type, e.ship_type as detailed_ship_type, v.length, v.beam,
+           v.imo, v.call_sign, v.flag_state, v.wind_assisted, e.gross_tonnage,
+           v.technical_fit_score
+    FROM vessels_static v
+    LEFT JOIN eu_mrv_emissions e ON v.imo = e.imo
+    WHERE v.mmsi IN (SELECT value FROM json_each(:mmsis))
+      AND (:wind_assisted_only = 0 OR v.wind_assisted = 1)
+      AND (:ship_type IS NULL OR (v.ship_type >= :ship_type AND v.ship_type < :ship_type_upper))
+'''
+
+
 @app.route('/ships/api/vessels')
 def get_vessels():
     """
@@ -438,36 +1259,29 @@ def get_vessels():
     seen_mmsi = set()
     
     # First: Add real-time AIS vessels (in-memory) - these are always included
-    for mmsi, static in vessel_static_data.items():
+    for base in _vessel_base_cache:
         # Apply filters
-        if wind_assisted_only and static.get('wind_assisted', 0) != 1:
+        if wind_assisted_only and base['wind_assisted'] != 1:
             continue
         
         if ship_type is not None:
-            if not static.get('ship_type') or static['ship_type'] < ship_type or static['ship_type'] >= ship_type + 10:
+            if not base['ship_type'] or base['ship_type'] < ship_type or base['ship_type'] >= ship_type + 10:
                 continue
         
-        vessel_info = {
-            'mmsi': mmsi,
-            'name': static['name'],
-            'length': static['length'],
-            'flag_state': static['flag_state'],
-            'ship_type': static['ship_type'],
-            'detailed_ship_type': static.get('detailed_ship_type'),
-            'wind_assisted': static.get('wind_assisted', 0),
-            'gross_tonnage': static.get('gross_tonnage')
-        }
+        mmsi = base['mmsi']
         
         # Add position if available
-        if mmsi in vessel_positions:
-            pos = vessel_positions[mmsi]
+        pos = vessel_positions.get(mmsi)
+        if pos:
             # Apply viewport filter
             if min_lat is not None:
                 if pos.get('lat') < min_lat or pos.get('lat') > max_lat:
                     continue
                 if pos.get('lon') < min_lon or pos.get('lon') > max_lon:
                     continue
-            vessel_info.update(pos)
+            vessel_info = {**base, **pos}
+        else:
+            vessel_info = dict(base)
         
         vessels.append(vessel_info)
         seen_mmsi.add(mmsi)
@@ -481,106 +1295,87 @@ def get_vessels():
     if not db_path.exists():
         db_path = project_root / DB_NAME
     
-    conn = None
     try:
-        conn = sqlite3.connect(str(db_path), timeout=60)
-        conn.execute('PRAGMA journal_mode=WAL')
-        ensure_technical_fit_score_column(conn)
-        cursor = conn.cursor()
-        
-        # Build query with viewport filtering
-        query = '''
-            SELECT p.mmsi, p.latitude, p.longitude, p.sog, p.cog, MAX(p.timestamp) as timestamp
-            FROM vessel_positions p
-            WHERE p.timestamp >= datetime('now', '-6 hours')
-        '''
-        params = []
-        
-        # Add viewport filter if provided
-        if min_lat is not None:
-            query += ' AND p.latitude >= ? AND p.latitude <= ? AND p.longitude >= ? AND p.longitude <= ?'
-            params.extend([min_lat, max_lat, min_lon, max_lon])
-        
-        query += ' GROUP BY p.mmsi ORDER BY timestamp DESC LIMIT ?'
-        params.append(limit - len(vessels))
-        
-        cursor.execute(query, params)
-        recent_positions = {row[0]: {'lat': row[1], 'lon': row[2], 'sog': row[3], 'cog': row[4], 'timestamp': row[5]} 
-                          for row in cursor.fetchall()}
-        
-        if not recent_positions:
-            return jsonify(vessels)
-        
-        # Get vessel info for those MMSIs (use parameterized query to avoid SQL injection)
-        mmsi_list = list(recent_positions.keys())
-        if not mmsi_list:
-            return jsonify(vessels)
-        
-        placeholders = ','.join(['?'] * len(mmsi_list))
-        vessel_query = f'''
-            SELECT v.mmsi, v.name, v.ship_type, e.ship_type as detailed_ship_type, v.length, v.beam,
-                   v.imo, v.call_sign, v.flag_state, v.wind_assisted, e.gross_tonnage,
-                   v.technical_fit_score
-            FROM vessels_static v
-            LEFT JOIN eu_mrv_emissions e ON v.imo = e.imo
-            WHERE v.mmsi IN ({placeholders})
-        '''
-        
-        query_params = mmsi_list[:]
-        
-        # Add filters
-        if wind_assisted_only:
-            vessel_query += ' AND v.wind_assisted = 1'
-        if ship_type is not None:
-            vessel_query += ' AND v.ship_type >= ? AND v.ship_type < ?'
-            query_params.extend([ship_type, ship_type + 10])
-        
-        cursor.execute(vessel_query, query_params)
-        db_vessels = cursor.fetchall()
-        
-        for vessel in db_vessels:
-            mmsi, name, ship_type_val, detailed_type, length, beam, imo, call_sign, flag, wind_assisted_val, gt, technical_fit_score = vessel
+        with get_pool(db_path).acquire() as conn:
+            ensure_schema(conn, db_path)
+            cursor = conn.cursor()
             
-            # Skip if already in real-time data
-            if mmsi in seen_mmsi:
-                continue
-                
-            pos = recent_positions.get(mmsi, {})
-            if not pos:
-                continue
+            # Viewport filter applies only when bounds are given (NULL = whole map)
+            positions_query = LATEST_POSITIONS_QUERY if str(db_path) in _latest_ready else RECENT_POSITIONS_QUERY
+            cursor.execute(positions_query, {
+                'min_lat': min_lat, 'max_lat': max_lat,
+                'min_lon': min_lon, 'max_lon': max_lon,
+                'limit': limit - len(vessels)
+            })
+            recent_positions = {row[0]: {'lat': row[1], 'lon': row[2], 'sog': row[3], 'cog': row[4], 'timestamp': row[5]} 
+                              for row in cursor.fetchall()}
             
-            vessels.append({
-                'mmsi': mmsi,
-                'name': name or 'Unknown',
-                'ship_type': ship_type_val,
-                'detailed_ship_type': detailed_type,
-                'length': length,
-                'beam': beam,
-                'imo': imo,
-                'call_sign': call_sign,
-                'flag_state': flag or 'Unknown',
-                'wind_assisted': wind_assisted_val or 0,
-                'gross_tonnage': gt,
-                'technical_fit_score': technical_fit_score,
-                'lat': pos.get('lat'),
-                'lon': pos.get('lon'),
-                'sog': pos.get('sog'),
-                'cog': pos.get('cog'),
-                'timestamp': pos.get('timestamp')
+            if not recent_positions:
+                return jsonify(vessels)
+            
+            # Get vessel info for those MMSIs (use parameterized query to avoid SQL injection)
+            mmsi_list = list(recent_positions.keys())
+            if not mmsi_list:
+                return jsonify(vessels)
+            
+            # MMSIs are bound as one JSON array so the SQL text is the same for every request
+            cursor.execute(RECENT_VESSEL_INFO_QUERY, {
+                'mmsis': _dumps(mmsi_list),
+                'wind_assisted_only': int(wind_assisted_only),
+                'ship_type': ship_type,
+                'ship_type_upper': ship_type + 10 if ship_type is not None else None
             })
+            db_vessels = cursor.fetchall()
             
-            if len(vessels) >= limit:
-                break
+            for vessel in db_vessels:
+                mmsi, name, ship_type_val, detailed_type, length, beam, imo, call_sign, flag, wind_assisted_val, gt, technical_fit_score = vessel
+                
+                # Skip if already in real-time data
+                if mmsi in seen_mmsi:
+                    continue
+                
+                pos = recent_positions.get(mmsi, {})
+                if not pos:
+                    continue
+                
+                vessels.append({
+                    'mmsi': mmsi,
+                    'name': name or 'Unknown',
+                    'ship_type': ship_type_val,
+                    'detailed_ship_type': detailed_type,
+                    'length': length,
+                    'beam': beam,
+                    'imo': imo,
+                    'call_sign': call_sign,
+                    'flag_state': flag or 'Unknown',
+                    'wind_assisted': wind_assisted_val or 0,
+                    'gross_tonnage': gt,
+                    'technical_fit_score': technical_fit_score,
+                    'lat': pos.get('lat'),
+                    'lon': pos.get('lon'),
+                    'sog': pos.get('sog'),
+                    'cog': pos.get('cog'),
+                    'timestamp': pos.get('timestamp')
+                })
+                
+                if len(vessels) >= limit:
+                    break
             
     except Exception as e:
         print(f"Error loading database vessels: {e}")
-    finally:
-        if conn:
-            conn.close()
     
     return jsonify(vessels)
 
 
+@app.route('/ships/api/vessels/positions')
+def get_vessel_positions():
+    """
+    Get live positions only, keyed by MMSI.
+    Lighter than /api/vessels for clients that already have the static vessel data.
+    """
+    return jsonify(vessel_positions_snapshot())
+
+
 @app.route('/ships/api/stats')
 def get_stats():
     """Get tracking statistics."""
@@ -704,6 +1499,43 @@ def filter_route_outliers(positions, max_speed_knots=60, max_jump_km=500, max_ti
     return filtered
 
 
+# Route history for one vessel. The epoch variants compare integers on
+# ix_positions_route_epoch; the text variants are used when ts_epoch is unavailable.
+ROUTE_RECENT_EPOCH_QUERY = '''
+    SELECT latitude, longitude, sog, cog, timestamp
+    FROM vessel_positions
+    WHERE mmsi = ?
+      AND ts_epoch >= ?
+    ORDER BY ts_epoch ASC
+    LIMIT 1000
+'''
+ROUTE_LATEST_EPOCH_QUERY = '''
+    SELECT latitude, longitude, sog, cog, timestamp
+    FROM vessel_positions
+    WHERE mmsi = ?
+    ORDER BY ts_epoch DESC
+    LIMIT 1000
+'''
+# Text cutoffs are bound in both separator forms: the range scan starts at the
+# earlier 'YYYY-MM-DD HH:MM:SS' one, and ISO 'T' rows must also pass the 'T' cutoff.
+ROUTE_RECENT_TEXT_QUERY = '''
+    SELECT latitude, longitude, sog, cog, timestamp
+    FROM vessel_positions
+    WHERE mmsi = ?
+      AND timestamp >= ?
+      AND (timestamp >= ? OR substr(timestamp, 11, 1) = ' ')
+    ORDER BY timestamp ASC
+    LIMIT 1000
+'''
+ROUTE_LATEST_TEXT_QUERY = '''
+    SELECT latitude, longitude, sog, cog, timestamp
+    FROM vessel_positions
+    WHERE mmsi = ?
+    ORDER BY timestamp DESC
+    LIMIT 1000
+'''
+
+
 @app.route('/ships/api/vessel/<int:mmsi>/route')
 def get_vessel_route(mmsi):
     """Get position history for a specific vessel with outlier filtering."""
@@ -714,8 +1546,6 @@ def get_vessel_route(mmsi):
     db_path = project_root / "data" / DB_NAME
     if not db_path.exists():
         db_path = project_root / DB_NAME
-    
-    conn = None
     try:
         if not db_path.exists():
             return jsonify({'error': 'Database not found'}), 404
@@ -723,11 +1553,7 @@ def get_vessel_route(mmsi):
         # Use a separate connection with higher timeout for concurrent access
         # WAL mode allows multiple readers, but we need sufficient timeout
         # This allows route queries to run concurrently with vessel loading queries
-        conn = sqlite3.connect(str(db_path), timeout=60)
-        conn.execute('PRAGMA journal_mode=WAL')
-        conn.execute('PRAGMA synchronous=NORMAL')  # Faster reads, still safe with WAL
-        conn.execute('PRAGMA temp_store=MEMORY')  # Use memory for temp tables
-        conn.execute('PRAGMA cache_size=-64000')  # 64MB cache for faster queries
+        conn = get_ro_conn(db_path)
         cursor = conn.cursor()
         
         # Use index hint to ensure we use the mmsi+timestamp index
@@ -741,16 +1567,20 @@ def get_vessel_route(mmsi):
         
         print(f"[Route] Found {total_count:,} total positions for MMSI {mmsi}, filtering for last {hours} hours")
         
-        # Optimized query: Use index on (mmsi, timestamp) and limit early
-        # Try to get positions from the last N hours
-        cursor.execute('''
-            SELECT latitude, longitude, sog, cog, timestamp
-            FROM vessel_positions
-            WHERE mmsi = ?
-              AND datetime(timestamp) >= datetime('now', '-' || ? || ' hours')
-            ORDER BY timestamp ASC
-            LIMIT 1000
-        ''', (mmsi, hours))
+        # Optimized query: range scan on (mmsi, ts_epoch) and limit early.
+        # Try to get positions from the last N hours; the cutoff is computed here
+        # and compared against the bare column, so the index range scan stays usable.
+        use_epoch = str(db_path) in _epoch_ready
+        if use_epoch:
+            cutoff = int(time.time()) - hours * 3600
+            cursor.execute(ROUTE_RECENT_EPOCH_QUERY, (mmsi, cutoff))
+        else:
+            # Positions are stored as ISO 'YYYY-MM-DDTHH:MM:SS...' or as aisstream's
+            # 'YYYY-MM-DD HH:MM:SS...'; a space-form cutoff alone lets every 'T' row
+            # of the cutoff day through, a 'T' cutoff alone drops that day's space rows
+            cutoff = datetime.utcnow() - timedelta(hours=hours)
+            cursor.execute(ROUTE_RECENT_TEXT_QUERY, (mmsi, cutoff.strftime('%Y-%m-%d %H:%M:%S'),
+                                                     cutoff.strftime('%Y-%m-%dT%H:%M:%S')))
         
         positions = cursor.fetchall()
         
@@ -758,13 +1588,7 @@ def get_vessel_route(mmsi):
         if not positions:
             print(f"[Route] No positions in last {hours}h, fetching most recent positions")
             # Use DESC with LIMIT then reverse - faster than fetching all and sorting
-            cursor.execute('''
-                SELECT latitude, longitude, sog, cog, timestamp
-                FROM vessel_positions
-                WHERE mmsi = ?
-                ORDER BY timestamp DESC
-                LIMIT 1000
-            ''', (mmsi,))
+            cursor.execute(ROUTE_LATEST_EPOCH_QUERY if use_epoch else ROUTE_LATEST_TEXT_QUERY, (mmsi,))
             positions = cursor.fetchall()
             # Reverse to get chronological order
             positions = list(reversed(positions))
@@ -854,9 +1678,57 @@ def get_vessel_route(mmsi):
         import traceback
         print(f"Route fetch error: {e}\n{traceback.format_exc()}")
         return jsonify({'error': str(e)}), 500
-    finally:
-        if conn:
-            conn.close()
+
+
+# Database browser query; every filter is optional (NULL = not applied)
+_ALL_VESSELS_QUERY_TEMPLATE = '''
+    SELECT mmsi, name, ship_type, detailed_ship_type, length, beam, imo, call_sign, flag_state,
+           destination, eta, draught, last_updated, signatory_company
+    FROM vessels_static
+    WHERE (:min_length IS NULL OR length >= :min_length)
+      AND (:max_length IS NULL OR length <= :max_length)
+      AND (:ship_type IS NULL OR (ship_type >= :ship_type AND ship_type < :ship_type_upper))
+      AND (:flag_state IS NULL OR flag_state = :flag_state)
+      {search_filter}
+    ORDER BY last_updated DESC
+    LIMIT 1000
+'''
+_LIKE_SEARCH = 'name LIKE :search OR signatory_company LIKE :search'
+_FTS_SEARCH = 'rowid IN (SELECT rowid FROM vessels_fts WHERE vessels_fts MATCH :search)'
+# Digit-only searches also match an MMSI prefix, as an integer range on the primary key
+_MMSI_SEARCH = '(mmsi >= :mmsi_low AND mmsi < :mmsi_high)'
+
+ALL_VESSELS_LIKE_QUERY = _ALL_VESSELS_QUERY_TEMPLATE.format(
+    search_filter=f'AND (:search IS NULL OR {_LIKE_SEARCH})'
+)
+ALL_VESSELS_FTS_QUERY = _ALL_VESSELS_QUERY_TEMPLATE.format(
+    search_filter=f'AND {_FTS_SEARCH}'
+)
+ALL_VESSELS_MMSI_LIKE_QUERY = _ALL_VESSELS_QUERY_TEMPLATE.format(
+    search_filter=f'AND ({_MMSI_SEARCH} OR {_LIKE_SEARCH})'
+)
+ALL_VESSELS_MMSI_FTS_QUERY = _ALL_VESSELS_QUERY_TEMPLATE.format(
+    search_filter=f'AND ({_MMSI_SEARCH} OR {_FTS_SEARCH})'
+)
+MMSI_DIGITS = 9
+
+
+def _mmsi_prefix_range(digits):
+    """Half-open MMSI range [low, high) for a digit-string prefix ('2350' -> 235000000..235100000)."""
+    scale = 10 ** (MMSI_DIGITS - len(digits))
+    value = int(digits)
+    return value * scale, (value + 1) * scale
+
+
+def _fts_match_query(search):
+    """
+    Turn free-text search input into an FTS5 prefix query ('"foo"* "bar"*').
+    
+    Tokens without letters or digits ('&', '-') are dropped, since the unicode61
+    tokenizer indexes nothing for them; an empty result means use LIKE instead.
+    """
+    tokens = [t.replace('"', '') for t in search.split()]
+    return ' '.join(f'"{t}"*' for t in tokens if any(ch.isalnum() for ch in t))
 
 
 @app.route('/ships/api/database/vessels')
@@ -864,11 +1736,8 @@ def get_all_vessels():
     """Get all vessels from database with filtering."""
     project_root = Path(__file__).parent.parent.parent
     db_path = project_root / DB_NAME
-    
-    conn = None
     try:
-        conn = sqlite3.connect(db_path, timeout=30)
-        conn.execute('PRAGMA journal_mode=WAL')
+        conn = get_ro_conn(db_path)
         cursor = conn.cursor()
         
         # Get filter parameters
@@ -878,66 +1747,41 @@ def get_all_vessels():
         flag_state = request.args.get('flag_state', type=str)
         search = request.args.get('search', type=str)
         
-        # Build query
-        query = 'SELECT mmsi, name, ship_type, detailed_ship_type, length, beam, imo, call_sign, flag_state, destination, eta, draught, last_updated, signatory_company FROM vessels_static WHERE 1=1'
-        params = []
-        
-        if min_length:
-            query += ' AND length >= ?'
-            params.append(min_length)
-        
-        if max_length:
-            query += ' AND length <= ?'
-            params.append(max_length)
-        
-        if ship_type:
-            query += ' AND ship_type >= ? AND ship_type < ?'
-            params.append(ship_type)
-            params.append(ship_type + 10)
-        
-        if flag_state:
-            query += ' AND flag_state = ?'
-            params.append(flag_state)
+        # Unset filters are passed as NULL so the SQL text (and SQLite's cached plan) never changes
+        params = {
+            'min_length': min_length or None,
+            'max_length': max_length or None,
+            'ship_type': ship_type or None,
+            'ship_type_upper': ship_type + 10 if ship_type else None,
+            'flag_state': flag_state or None,
+            'search': None
+        }
+        query = ALL_VESSELS_LIKE_QUERY
         
         if search:
-            query += ' AND (name LIKE ? OR CAST(mmsi AS TEXT) LIKE ? OR signatory_company LIKE ?)'
-            search_param = f'%{search}%'
-            params.append(search_param)
-            params.append(search_param)
-            params.append(search_param)
-        
-        query += ' ORDER BY last_updated DESC LIMIT 1000'
+            # Prefix match on name/company tokens via the full-text index, LIKE otherwise
+            fts_query = _fts_match_query(search)
+            use_fts = bool(fts_query) and str(db_path) in _fts_ready
+            params['search'] = fts_query if use_fts else f'%{search}%'
+            
+            if search.isascii() and search.isdigit() and len(search) <= MMSI_DIGITS:
+                # Names and companies can contain digits too, so the MMSI range is an extra OR
+                query = ALL_VESSELS_MMSI_FTS_QUERY if use_fts else ALL_VESSELS_MMSI_LIKE_QUERY
+                params['mmsi_low'], params['mmsi_high'] = _mmsi_prefix_range(search)
+            elif use_fts:
+                query = ALL_VESSELS_FTS_QUERY
         
         cursor.execute(query, params)
-        vessels = cursor.fetchall()
+        columns = [description[0] for description in cursor.description]
         
-        # Format results
-        results = []
-        for v in vessels:
-            results.append({
-                'mmsi': v[0],
-                'name': v[1],
-                'ship_type': v[2],
-                'detailed_ship_type': v[3],
-                'length': v[4],
-                'beam': v[5],
-                'imo': v[6],
-                'call_sign': v[7],
-                'flag_state': v[8],
-                'destination': v[9],
-                'eta': v[10],
-                'draught': v[11],
-                'last_updated': v[12],
-                'signatory_company': v[13]
-            })
+        # Compact shape: column names once, rows as arrays
+        if request.args.get('format') == 'columns':
+            return jsonify({'columns': columns, 'rows': cursor.fetchall()})
         
-        return jsonify(results)
+        return jsonify([dict(zip(columns, row)) for row in cursor])
     except Exception as e:
         print(f"Error in get_all_vessels: {e}")
         return jsonify({'error': str(e)}), 500
-    finally:
-        if conn:
-            conn.close()
 
 
 @app.route('/ships/api/companies')
@@ -945,23 +1789,28 @@ def get_companies():
     """Get company statistics."""
     project_root = Path(__file__).parent.parent.parent
     db_path = project_root / DB_NAME
-    
-    conn = None
     try:
-        conn = sqlite3.connect(db_path, timeout=30)
-        conn.execute('PRAGMA journal_mode=WAL')
+        conn = get_ro_conn(db_path)
         cursor = conn.cursor()
         
-        # Get company statistics
-        cursor.execute('''
-            SELECT signatory_company, COUNT(*) as vessel_count, 
-                   AVG(length) as avg_length, MAX(length) as max_length
-            FROM vessels_static
-            WHERE signatory_company IS NOT NULL AND signatory_company != ''
-            GROUP BY signatory_company
-            ORDER BY vessel_count DESC
-            LIMIT 50
-        ''')
+        # Get company statistics (materialized by refresh_company_stats)
+        if str(db_path) in _company_stats_ready:
+            cursor.execute('''
+                SELECT company, vessel_count, avg_length, max_length
+                FROM company_stats
+                ORDER BY vessel_count DESC
+                LIMIT 50
+            ''')
+        else:
+            cursor.execute('''
+                SELECT signatory_company, COUNT(*) as vessel_count, 
+                       AVG(length) as avg_length, MAX(length) as max_length
+                FROM vessels_static
+                WHERE signatory_company IS NOT NULL AND signatory_company != ''
+                GROUP BY signatory_company
+                ORDER BY vessel_count DESC
+                LIMIT 50
+            ''')
         
         companies = cursor.fetchall()
         results = []
@@ -977,9 +1826,6 @@ def get_companies():
     except Exception as e:
         print(f"Error in get_companies: {e}")
         return jsonify({'error': str(e)}), 500
-    finally:
-        if conn:
-            conn.close()
 
 
 @app.route('/ships/sql')
@@ -988,6 +1834,99 @@ def sql_query_page():
     return render_template('sql_query.html')
 
 
+_SELECT_LIST_RE = re.compile(r'^\s*SELECT\s+(DISTINCT\s+)?(?P<cols>.*?)\s+FROM\b', re.IGNORECASE | re.DOTALL)
+_SHIP_TYPE_COLUMN_RE = re.compile(r'^(\w+\.)?ship_type$', re.IGNORECASE)
+_SHIP_TYPE_SORT_RE = re.compile(r'\b(ORDER|GROUP)\s+BY\b.*\bship_type\b', re.IGNORECASE | re.DOTALL)
+# Positional sort/group terms ('ORDER BY 1', 'GROUP BY name, 2') would switch to the mapped name
+_POSITIONAL_SORT_RE = re.compile(r'\b(ORDER|GROUP)\s+BY\b[^;]*?(\bBY|,)\s*\d+\b', re.IGNORECASE | re.DOTALL)
+# Only the first SELECT of a compound query would be rewritten
+_COMPOUND_SELECT_RE = re.compile(r'\b(UNION|INTERSECT|EXCEPT)\b', re.IGNORECASE)
+
+
+def _split_select_list(cols):
+    """Split a SELECT column list on top-level commas."""
+    items, depth, start = [], 0, 0
+    for i, ch in enumerate(cols):
+        if ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+        elif ch == ',' and depth == 0:
+            items.append(cols[start:i])
+            start = i + 1
+    items.append(cols[start:])
+    return items
+
+
+def _map_ship_type_in_sql(query):
+    """
+    Rewrite a plain 'ship_type' select column to 'ship_type_name(ship_type) AS ship_type'
+    so SQLite maps codes to names while reading rows.
+    
+    Returns:
+        (query, rewritten) - rewritten is False when the query is left as-is
+        (SELECT *, subqueries, compound selects, or sorting/grouping on
+        ship_type or by column position); callers then map the rows instead
+    """
+    match = _SELECT_LIST_RE.match(query)
+    if not match or _COMPOUND_SELECT_RE.search(query):
+        return query, False
+    if _SHIP_TYPE_SORT_RE.search(query, match.end()) or _POSITIONAL_SORT_RE.search(query, match.end()):
+        return query, False
+    
+    cols = match.group('cols')
+    if 'select' in cols.lower():
+        return query, False
+    
+    items = _split_select_list(cols)
+    if any(item.strip().endswith('*') for item in items):
+        return query, False
+    
+    for i, item in enumerate(items):
+        column = item.strip()
+        if _SHIP_TYPE_COLUMN_RE.match(column):
+            leading = item[:len(item) - len(item.lstrip())]
+            items[i] = f'{leading}ship_type_name({column}) AS ship_type'
+            new_cols = ','.join(items)
+            return query[:match.start('cols')] + new_cols + query[match.end('cols'):], True
+    return query, False
+
+
+def _rows_with_ship_type_names(rows, ship_type_idx, keep=None):
+    """
+    Convert result rows to lists, mapping the ship_type column (if any) to names.
+    
+    keep, if given, lists the column indexes to return (see _visible_columns).
+    """
+    if ship_type_idx is not None:
+        i = ship_type_idx
+        rows = [[*row[:i], get_ship_type_name(row[i]), *row[i + 1:]] for row in rows]
+    if keep is not None:
+        return [[row[j] for j in keep] for row in rows]
+    return [list(row) for row in rows]
+
+
+# Generated columns added by migrations (ensure_position_epoch), left out of
+# console/export results such as SELECT * unless the query names them
+INTERNAL_COLUMNS = ('ts_epoch',)
+
+
+def _visible_columns(query, columns):
+    """
+    Drop internal columns the query did not ask for by name.
+    
+    Returns:
+        (columns, keep) - keep is the list of column indexes to return, or
+        None when every column is shown
+    """
+    named = query.lower()
+    keep = [i for i, name in enumerate(columns)
+            if name not in INTERNAL_COLUMNS or name in named]
+    if len(keep) == len(columns):
+        return columns, None
+    return [columns[i] for i in keep], keep
+
+
 @app.route('/ships/api/sql/query', methods=['POST'])
 def execute_sql_query():
     """Execute a raw SQL query (READ-ONLY)."""
@@ -1004,31 +1943,27 @@ def execute_sql_query():
         
         project_root = Path(__file__).parent.parent.parent
         db_path = project_root / DB_NAME
-        
-        conn = None
         start_time = time.time()
         
         try:
-            conn = sqlite3.connect(db_path, timeout=30)
-            conn.execute('PRAGMA journal_mode=WAL')
+            conn = get_ro_conn(db_path)
             cursor = conn.cursor()
             
+            # Map ship_type codes to names inside SQLite where the query allows it
+            query, ship_type_mapped = _map_ship_type_in_sql(query)
             cursor.execute(query)
             rows = cursor.fetchall()
             columns = [description[0] for description in cursor.description] if cursor.description else []
             
             # Convert ship_type codes to names if ship_type column exists
             ship_type_idx = None
-            if 'ship_type' in columns:
+            if 'ship_type' in columns and not ship_type_mapped:
                 ship_type_idx = columns.index('ship_type')
             
+            columns, keep = _visible_columns(query, columns)
+            
             # Process rows to replace ship_type codes with names
-            processed_rows = []
-            for row in rows:
-                row_list = list(row)
-                if ship_type_idx is not None and row_list[ship_type_idx] is not None:
-                    row_list[ship_type_idx] = get_ship_type_name(row_list[ship_type_idx])
-                processed_rows.append(row_list)
+            processed_rows = _rows_with_ship_type_names(rows, ship_type_idx, keep)
             
             execution_time = int((time.time() - start_time) * 1000)  # ms
             
@@ -1041,9 +1976,6 @@ def execute_sql_query():
             
         except sqlite3.Error as e:
             return jsonify({'error': f'SQL Error: {str(e)}'}), 400
-        finally:
-            if conn:
-                conn.close()
                 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -1065,52 +1997,51 @@ def export_sql_query():
         
         project_root = Path(__file__).parent.parent.parent
         db_path = project_root / DB_NAME
-        
-        conn = None
         try:
-            conn = sqlite3.connect(db_path, timeout=30)
-            conn.execute('PRAGMA journal_mode=WAL')
+            conn = get_ro_conn(db_path)
             cursor = conn.cursor()
             
+            # Map ship_type codes to names inside SQLite where the query allows it
+            query, ship_type_mapped = _map_ship_type_in_sql(query)
             cursor.execute(query)
-            rows = cursor.fetchall()
             columns = [description[0] for description in cursor.description] if cursor.description else []
             
             # Convert ship_type codes to names if ship_type column exists
             ship_type_idx = None
-            if 'ship_type' in columns:
+            if 'ship_type' in columns and not ship_type_mapped:
                 ship_type_idx = columns.index('ship_type')
-            
-            # Process rows to replace ship_type codes with names
-            processed_rows = []
-            for row in rows:
-                row_list = list(row)
-                if ship_type_idx is not None and row_list[ship_type_idx] is not None:
-                    row_list[ship_type_idx] = get_ship_type_name(row_list[ship_type_idx])
-                processed_rows.append(row_list)
+            columns, keep = _visible_columns(query, columns)
             
             # Generate CSV
             import io
             import csv
             
-            output = io.StringIO()
-            writer = csv.writer(output)
-            writer.writerow(columns)
-            writer.writerows(processed_rows)
+            def generate():
+                # One small buffer reused per row; rows are read from the cursor as they are sent
+                output = io.StringIO()
+                writer = csv.writer(output)
+                writer.writerow(columns)
+                yield output.getvalue()
+                
+                while True:
+                    rows = cursor.fetchmany(500)
+                    if not rows:
+                        break
+                    output.seek(0)
+                    output.truncate(0)
+                    writer.writerows(_rows_with_ship_type_names(rows, ship_type_idx, keep))
+                    yield output.getvalue()
             
             # Return as downloadable file
             from flask import Response
             return Response(
-                output.getvalue(),
+                stream_with_context(generate()),
                 mimetype='text/csv',
                 headers={'Content-Disposition': 'attachment; filename=query_results.csv'}
             )
             
         except sqlite3.Error as e:
             return jsonify({'error': f'SQL Error: {str(e)}'}), 400
-        finally:
-            if conn:
-                conn.close()
                 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -1122,7 +2053,7 @@ def handle_connect():
     print('Client connected')
     emit('initial_data', {
         'vessels': list(vessel_static_data.keys()),
-        'positions': vessel_positions
+        'positions': vessel_positions_snapshot()
     })
 
 
@@ -1157,14 +2088,26 @@ def start_tracking():
         
         print(f"Creating {len(batches)} tracking connections across {len(api_keys)} API key(s)...")
         
-        # Start trackers - rotate API keys (3 connections per key)
+        # Batched writer for position history; rows still queued are written on exit
+        threading.Thread(target=_insert_flusher, daemon=True).start()
+        atexit.register(flush_position_buffer)
+        
+        # Create trackers - rotate API keys (3 connections per key)
+        trackers = []
         for i, batch in enumerate(batches, 1):
             api_key_index = (i - 1) // 3  # Use each API key for 3 connections
             api_key = api_keys[api_key_index % len(api_keys)]
             print(f"Batch {i}: Using API key #{api_key_index + 1}")
-            tracker = VesselTrackerWebSocket(i, batch, api_key)
-            tracker.start()
-            time.sleep(1)
+            trackers.append(VesselTrackerWebSocket(i, batch, api_key))
+        
+        if WEBSOCKETS_AVAILABLE:
+            # One event loop thread for all connections
+            threading.Thread(target=_run_trackers_async, args=(trackers,), daemon=True).start()
+        else:
+            # Fallback: one websocket-client thread per connection
+            for tracker in trackers:
+                tracker.start()
+                time.sleep(1)
         
         tracking_active = True
         print(f"Tracking {sum(len(b) for b in batches)} vessels across {len(batches)} connections")
@@ -1178,12 +2121,10 @@ def get_vessel_emissions(imo):
     """Get emissions data for a specific vessel by IMO."""
     project_root = Path(__file__).parent.parent.parent
     db_path = project_root / DB_NAME
-    
-    conn = None
     try:
-        conn = sqlite3.connect(db_path, timeout=30)
-        ensure_econowind_column(conn)
+        conn = get_ro_conn(db_path)
         cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
         
         cursor.execute('''
             SELECT e.*, v.mmsi, v.name as ais_name, v.length, v.flag_state
@@ -1196,15 +2137,11 @@ def get_vessel_emissions(imo):
         if not row:
             return jsonify({'error': 'Vessel not found'}), 404
         
-        columns = [description[0] for description in cursor.description]
-        result = dict(zip(columns, row))
+        result = dict(row)
         
         return jsonify(result)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        if conn:
-            conn.close()
 
 
 @app.route('/ships/api/emissions/vessel/<int:imo>/score-breakdown')
@@ -1213,156 +2150,151 @@ def get_score_breakdown(imo):
     project_root = Path(__file__).parent.parent.parent
     db_path = project_root / DB_NAME
     
-    conn = None
     try:
-        conn = sqlite3.connect(db_path, timeout=30)
-        ensure_econowind_column(conn)
-        cursor = conn.cursor()
-        
-        # Get vessel data
-        cursor.execute('''
-            SELECT e.imo, e.vessel_name, e.ship_type, e.avg_co2_per_distance, 
-                   e.technical_efficiency, e.econowind_fit_score, e.total_co2_emissions,
-                   v.length
-            FROM eu_mrv_emissions e
-            LEFT JOIN vessels_static v ON e.imo = v.imo
-            WHERE e.imo = ?
-        ''', (imo,))
-        
-        row = cursor.fetchone()
-        if not row:
-            return jsonify({'error': 'Vessel not found'}), 404
-        
-        imo, vessel_name, ship_type, avg_co2, tech_eff, total_score, total_co2, length = row
-        
-        # Calculate score breakdown
-        breakdown = {
-            'vessel_name': vessel_name,
-            'imo': imo,
-            'total_score': total_score or 0,
-            'max_score': 8,
-            'breakdown': []
-        }
-        
-        # 1. Ship type scoring
-        preferred_types = {
-            "Bulk carrier", "General cargo", "Chemical tanker",
-            "LNG carrier", "Other ship types", "Ro-Ro cargo ship"
-        }
-        ship_type_score = 2 if ship_type in preferred_types else 0
-        breakdown['breakdown'].append({
-            'category': 'Ship Type',
-            'score': ship_type_score,
-            'max': 2,
-            'value': ship_type,
-            'explanation': f"{'✓ Preferred type' if ship_type_score == 2 else '✗ Not a preferred type'} ({ship_type})",
-            'details': 'Preferred: Bulk carrier, General cargo, Chemical tanker, LNG carrier, Ro-Ro cargo, Other'
-        })
-        
-        # 2. Length scoring
-        length_score = 0
-        length_explanation = 'No length data available'
-        if length:
-            if 100 <= length <= 160:
-                length_score = 2
-                length_explanation = f'✓ Optimal size ({length}m is in 100-160m range)'
-            elif 80 <= length < 100 or 160 < length <= 200:
-                length_score = 1
-                length_explanation = f'~ Acceptable size ({length}m is in 80-100m or 160-200m range)'
-            else:
-                length_explanation = f'✗ Outside preferred range ({length}m)'
-        
-        breakdown['breakdown'].append({
-            'category': 'Vessel Length',
-            'score': length_score,
-            'max': 2,
-            'value': f'{length}m' if length else 'N/A',
-            'explanation': length_explanation,
-            'details': 'Optimal: 100-160m (+2), Acceptable: 80-100m or 160-200m (+1)'
-        })
-        
-        # 3. CO2 emissions intensity
-        co2_score = 0
-        co2_explanation = 'No CO₂/distance data available'
-        if avg_co2:
-            # Get quantiles
-            cursor.execute('SELECT avg_co2_per_distance FROM eu_mrv_emissions WHERE avg_co2_per_distance IS NOT NULL')
-            co2_values = [r[0] for r in cursor.fetchall()]
-            if co2_values:
-                import numpy as np
-                co2_75 = np.percentile(co2_values, 75)
-                co2_50 = np.percentile(co2_values, 50)
-                
-                if avg_co2 >= co2_75:
-                    co2_score = 2
-                    co2_explanation = f'✓ High emitter ({avg_co2:.1f} kg/nm, top 25%)'
-                elif avg_co2 >= co2_50:
-                    co2_score = 1
-                    co2_explanation = f'~ Above average ({avg_co2:.1f} kg/nm, above median)'
-                else:
-                    co2_explanation = f'✗ Below average ({avg_co2:.1f} kg/nm, already efficient)'
-        
-        breakdown['breakdown'].append({
-            'category': 'CO₂ Emissions Intensity',
-            'score': co2_score,
-            'max': 2,
-            'value': f'{avg_co2:.1f} kg/nm' if avg_co2 else 'N/A',
-            'explanation': co2_explanation,
-            'details': 'Top 25% emitters (+2), Above median (+1) - Higher emissions = more savings potential'
-        })
-        
-        # 4. Technical efficiency
-        eff_score = 0
-        eff_explanation = 'No technical efficiency data'
-        if tech_eff:
-            try:
-                eff_value = float(str(tech_eff).split('(')[-1].strip(')').split()[0])
-                if eff_value > 10:
-                    eff_score = 2
-                    eff_explanation = f'✓ Poor efficiency ({eff_value:.1f} gCO₂/t·nm)'
-                elif eff_value >= 6:
-                    eff_score = 1
-                    eff_explanation = f'~ Moderate efficiency ({eff_value:.1f} gCO₂/t·nm)'
+        with get_pool(db_path).acquire() as conn:
+            cursor = conn.cursor()
+            
+            # Get vessel data
+            cursor.execute('''
+                SELECT e.imo, e.vessel_name, e.ship_type, e.avg_co2_per_distance, 
+                       e.technical_efficiency, e.econowind_fit_score, e.total_co2_emissions,
+                       v.length
+                FROM eu_mrv_emissions e
+                LEFT JOIN vessels_static v ON e.imo = v.imo
+                WHERE e.imo = ?
+            ''', (imo,))
+            
+            row = cursor.fetchone()
+            if not row:
+                return jsonify({'error': 'Vessel not found'}), 404
+            
+            imo, vessel_name, ship_type, avg_co2, tech_eff, total_score, total_co2, length = row
+            
+            # Calculate score breakdown
+            breakdown = {
+                'vessel_name': vessel_name,
+                'imo': imo,
+                'total_score': total_score or 0,
+                'max_score': 8,
+                'breakdown': []
+            }
+            
+            # 1. Ship type scoring
+            preferred_types = {
+                "Bulk carrier", "General cargo", "Chemical tanker",
+                "LNG carrier", "Other ship types", "Ro-Ro cargo ship"
+            }
+            ship_type_score = 2 if ship_type in preferred_types else 0
+            breakdown['breakdown'].append({
+                'category': 'Ship Type',
+                'score': ship_type_score,
+                'max': 2,
+                'value': ship_type,
+                'explanation': f"{'✓ Preferred type' if ship_type_score == 2 else '✗ Not a preferred type'} ({ship_type})",
+                'details': 'Preferred: Bulk carrier, General cargo, Chemical tanker, LNG carrier, Ro-Ro cargo, Other'
+            })
+            
+            # 2. Length scoring
+            length_score = 0
+            length_explanation = 'No length data available'
+            if length:
+                if 100 <= length <= 160:
+                    length_score = 2
+                    length_explanation = f'✓ Optimal size ({length}m is in 100-160m range)'
+                elif 80 <= length < 100 or 160 < length <= 200:
+                    length_score = 1
+                    length_explanation = f'~ Acceptable size ({length}m is in 80-100m or 160-200m range)'
                 else:
-                    eff_explanation = f'✗ Good efficiency ({eff_value:.1f} gCO₂/t·nm)'
-            except:
-                eff_explanation = f'Could not parse: {tech_eff}'
-        
-        breakdown['breakdown'].append({
-            'category': 'Technical Efficiency',
-            'score': eff_score,
-            'max': 2,
-            'value': tech_eff or 'N/A',
-            'explanation': eff_explanation,
-            'details': 'Poor efficiency >10 (+2), Moderate 6-10 (+1) - Lower efficiency = more improvement potential'
-        })
-        
-        # Summary
-        calculated_total = sum(item['score'] for item in breakdown['breakdown'])
-        breakdown['calculated_total'] = calculated_total
-        breakdown['total_co2_emissions'] = total_co2
-        
-        # Recommendation
-        if calculated_total >= 6:
-            breakdown['recommendation'] = 'Excellent candidate for wind propulsion retrofit'
-            breakdown['recommendation_class'] = 'high'
-        elif calculated_total >= 4:
-            breakdown['recommendation'] = 'Good candidate for wind propulsion retrofit'
-            breakdown['recommendation_class'] = 'medium'
-        elif calculated_total >= 2:
-            breakdown['recommendation'] = 'Potential candidate, further analysis recommended'
-            breakdown['recommendation_class'] = 'low'
-        else:
-            breakdown['recommendation'] = 'Low priority for wind propulsion retrofit'
-            breakdown['recommendation_class'] = 'na'
-        
-        return jsonify(breakdown)
+                    length_explanation = f'✗ Outside preferred range ({length}m)'
+            
+            breakdown['breakdown'].append({
+                'category': 'Vessel Length',
+                'score': length_score,
+                'max': 2,
+                'value': f'{length}m' if length else 'N/A',
+                'explanation': length_explanation,
+                'details': 'Optimal: 100-160m (+2), Acceptable: 80-100m or 160-200m (+1)'
+            })
+            
+            # 3. CO2 emissions intensity
+            co2_score = 0
+            co2_explanation = 'No CO₂/distance data available'
+            if avg_co2:
+                # Get quantiles
+                cursor.execute('SELECT avg_co2_per_distance FROM eu_mrv_emissions WHERE avg_co2_per_distance IS NOT NULL')
+                co2_values = [r[0] for r in cursor.fetchall()]
+                if co2_values:
+                    import numpy as np
+                    co2_75 = np.percentile(co2_values, 75)
+                    co2_50 = np.percentile(co2_values, 50)
+                    
+                    if avg_co2 >= co2_75:
+                        co2_score = 2
+                        co2_explanation = f'✓ High emitter ({avg_co2:.1f} kg/nm, top 25%)'
+                    elif avg_co2 >= co2_50:
+                        co2_score = 1
+                        co2_explanation = f'~ Above average ({avg_co2:.1f} kg/nm, above median)'
+                    else:
+                        co2_explanation = f'✗ Below average ({avg_co2:.1f} kg/nm, already efficient)'
+            
+            breakdown['breakdown'].append({
+                'category': 'CO₂ Emissions Intensity',
+                'score': co2_score,
+                'max': 2,
+                'value': f'{avg_co2:.1f} kg/nm' if avg_co2 else 'N/A',
+                'explanation': co2_explanation,
+                'details': 'Top 25% emitters (+2), Above median (+1) - Higher emissions = more savings potential'
+            })
+            
+            # 4. Technical efficiency
+            eff_score = 0
+            eff_explanation = 'No technical efficiency data'
+            if tech_eff:
+                try:
+                    eff_value = float(str(tech_eff).split('(')[-1].strip(')').split()[0])
+                    if eff_value > 10:
+                        eff_score = 2
+                        eff_explanation = f'✓ Poor efficiency ({eff_value:.1f} gCO₂/t·nm)'
+                    elif eff_value >= 6:
+                        eff_score = 1
+                        eff_explanation = f'~ Moderate efficiency ({eff_value:.1f} gCO₂/t·nm)'
+                    else:
+                        eff_explanation = f'✗ Good efficiency ({eff_value:.1f} gCO₂/t·nm)'
+                except:
+                    eff_explanation = f'Could not parse: {tech_eff}'
+            
+            breakdown['breakdown'].append({
+                'category': 'Technical Efficiency',
+                'score': eff_score,
+                'max': 2,
+                'value': tech_eff or 'N/A',
+                'explanation': eff_explanation,
+                'details': 'Poor efficiency >10 (+2), Moderate 6-10 (+1) - Lower efficiency = more improvement potential'
+            })
+            
+            # Summary
+            calculated_total = sum(item['score'] for item in breakdown['breakdown'])
+            breakdown['calculated_total'] = calculated_total
+            breakdown['total_co2_emissions'] = total_co2
+            
+            # Recommendation
+            if calculated_total >= 6:
+                breakdown['recommendation'] = 'Excellent candidate for wind propulsion retrofit'
+                breakdown['recommendation_class'] = 'high'
+            elif calculated_total >= 4:
+                breakdown['recommendation'] = 'Good candidate for wind propulsion retrofit'
+                breakdown['recommendation_class'] = 'medium'
+            elif calculated_total >= 2:
+                breakdown['recommendation'] = 'Potential candidate, further analysis recommended'
+                breakdown['recommendation_class'] = 'low'
+            else:
+                breakdown['recommendation'] = 'Low priority for wind propulsion retrofit'
+                breakdown['recommendation_class'] = 'na'
+            
+            return jsonify(breakdown)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        if conn:
-            conn.close()
 
 
 @app.route('/ships/api/emissions/top')
@@ -1373,12 +2305,10 @@ def get_top_emitters():
     
     project_root = Path(__file__).parent.parent.parent
     db_path = project_root / DB_NAME
-    
-    conn = None
     try:
-        conn = sqlite3.connect(db_path, timeout=30)
-        ensure_econowind_column(conn)
+        conn = get_ro_conn(db_path)
         cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
         
         query = '''
             SELECT e.imo, e.vessel_name, e.ship_type, e.company_name,
@@ -1399,17 +2329,11 @@ def get_top_emitters():
         params.append(limit)
         
         cursor.execute(query, params)
-        rows = cursor.fetchall()
-        
-        columns = [description[0] for description in cursor.description]
-        results = [dict(zip(columns, row)) for row in rows]
+        results = [dict(r) for r in cursor.fetchall()]
         
         return jsonify(results)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        if conn:
-            conn.close()
 
 
 @app.route('/ships/api/emissions/company/<company_name>')
@@ -1417,12 +2341,10 @@ def get_company_emissions(company_name):
     """Get emissions data for all vessels of a specific company."""
     project_root = Path(__file__).parent.parent.parent
     db_path = project_root / DB_NAME
-    
-    conn = None
     try:
-        conn = sqlite3.connect(db_path, timeout=30)
-        ensure_econowind_column(conn)
+        conn = get_ro_conn(db_path)
         cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
         
         cursor.execute('''
             SELECT e.imo, e.vessel_name, e.ship_type, e.total_co2_emissions,
@@ -1434,13 +2356,16 @@ def get_company_emissions(company_name):
             ORDER BY e.total_co2_emissions DESC
         ''', (f'%{company_name}%',))
         
-        rows = cursor.fetchall()
-        columns = [description[0] for description in cursor.description]
-        results = [dict(zip(columns, row)) for row in rows]
+        results = [dict(r) for r in cursor.fetchall()]
         
-        # Calculate company totals
-        total_co2 = sum(r['total_co2_emissions'] for r in results if r['total_co2_emissions'])
-        total_vessels = len(results)
+        # Calculate company totals in SQLite rather than iterating the rows
+        cursor.execute('''
+            SELECT COALESCE(SUM(e.total_co2_emissions), 0), COUNT(*)
+            FROM eu_mrv_emissions e
+            LEFT JOIN vessels_static v ON e.imo = v.imo
+            WHERE e.company_name LIKE ?
+        ''', (f'%{company_name}%',))
+        total_co2, total_vessels = cursor.fetchone()
         
         return jsonify({
             'company': company_name,
@@ -1451,9 +2376,6 @@ def get_company_emissions(company_name):
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        if conn:
-            conn.close()
 
 
 @app.route('/ships/api/emissions/stats')
@@ -1461,11 +2383,8 @@ def get_emissions_stats():
     """Get overall emissions statistics."""
     project_root = Path(__file__).parent.parent.parent
     db_path = project_root / DB_NAME
-    
-    conn = None
     try:
-        conn = sqlite3.connect(db_path, timeout=30)
-        ensure_econowind_column(conn)
+        conn = get_ro_conn(db_path)
         cursor = conn.cursor()
         
         # Overall stats
@@ -1514,15 +2433,29 @@ def get_emissions_stats():
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        if conn:
-            conn.close()
 
 
 # Simple in-memory cache for vessel data (5 minute TTL)
 _vessel_cache = {}
 _vessel_cache_time = {}
 
+# Vessels present in both AIS and EU MRV data, largest emitters first.
+# The >= bound also excludes NULL emissions, and is a range scan on idx_mrv_co2_imo.
+COMBINED_VESSELS_QUERY = '''
+    SELECT v.mmsi, v.name, v.imo, v.ship_type, v.length, v.flag_state,
+           v.signatory_company, v.last_updated as ais_last_updated,
+           e.company_name as mrv_company, e.total_co2_emissions,
+           e.total_fuel_consumption, e.total_distance_travelled,
+           e.avg_co2_per_distance, e.reporting_period,
+           e.econowind_fit_score, v.technical_fit_score
+    FROM vessels_static v
+    INNER JOIN eu_mrv_emissions e ON v.imo = e.imo
+    WHERE e.total_co2_emissions >= :min_co2
+    ORDER BY e.total_co2_emissions DESC
+    LIMIT :limit OFFSET :offset
+'''
+
+
 @app.route('/ships/api/vessels/combined')
 def get_combined_vessel_data():
     """Get vessels with both AIS and emissions data."""
@@ -1551,70 +2484,42 @@ def get_combined_vessel_data():
     if not db_path.exists():
         db_path = project_root / DB_NAME
     
-    conn = None
     try:
         if not db_path.exists():
             return jsonify({'error': f'Database not found: {db_path}'}), 500
         
-        conn = sqlite3.connect(str(db_path), timeout=30)
-        ensure_econowind_column(conn)
-        ensure_technical_fit_score_column(conn)
-        cursor = conn.cursor()
-        
-        # Ensure indexes exist for performance
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_vessels_static_imo ON vessels_static(imo)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_mrv_imo ON eu_mrv_emissions(imo)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_mrv_co2 ON eu_mrv_emissions(total_co2_emissions)')
-        conn.commit()
-        
-        query = '''
-            SELECT v.mmsi, v.name, v.imo, v.ship_type, v.length, v.flag_state,
-                   v.signatory_company, v.last_updated as ais_last_updated,
-                   e.company_name as mrv_company, e.total_co2_emissions,
-                   e.total_fuel_consumption, e.total_distance_travelled,
-                   e.avg_co2_per_distance, e.reporting_period,
-                   e.econowind_fit_score, v.technical_fit_score
-            FROM vessels_static v
-            INNER JOIN eu_mrv_emissions e ON v.imo = e.imo
-            WHERE e.total_co2_emissions IS NOT NULL
-        '''
-        
-        params = []
-        if min_co2:
-            query += ' AND e.total_co2_emissions >= ?'
-            params.append(min_co2)
-        
-        query += ' ORDER BY e.total_co2_emissions DESC LIMIT ? OFFSET ?'
-        params.extend([limit, offset])
-        
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        
-        columns = [description[0] for description in cursor.description]
-        results = [dict(zip(columns, row)) for row in rows]
-        
-        # Cache the results
-        _vessel_cache[cache_key] = results
-        _vessel_cache_time[cache_key] = current_time
-        
-        # Clean old cache entries (older than 10 minutes)
-        for key in list(_vessel_cache_time.keys()):
-            if current_time - _vessel_cache_time[key] > 600:
-                _vessel_cache.pop(key, None)
-                _vessel_cache_time.pop(key, None)
-        
-        response = jsonify(results)
-        response.headers['X-Cache'] = 'MISS'
-        response.headers['Cache-Control'] = 'public, max-age=300'
-        return response
+        with get_pool(db_path).acquire() as conn:
+            ensure_schema(conn, db_path)
+            cursor = conn.cursor()
+            
+            cursor.row_factory = sqlite3.Row
+            cursor.execute(COMBINED_VESSELS_QUERY, {
+                # No minimum -> -inf, which still skips rows without emissions data
+                'min_co2': min_co2 if min_co2 is not None else float('-inf'),
+                'limit': limit,
+                'offset': offset
+            })
+            results = [dict(row) for row in cursor]
+            
+            # Cache the results
+            _vessel_cache[cache_key] = results
+            _vessel_cache_time[cache_key] = current_time
+            
+            # Clean old cache entries (older than 10 minutes)
+            for key in list(_vessel_cache_time.keys()):
+                if current_time - _vessel_cache_time[key] > 600:
+                    _vessel_cache.pop(key, None)
+                    _vessel_cache_time.pop(key, None)
+            
+            response = jsonify(results)
+            response.headers['X-Cache'] = 'MISS'
+            response.headers['Cache-Control'] = 'public, max-age=300'
+            return response
     except Exception as e:
         import traceback
         error_msg = f"{str(e)}\n{traceback.format_exc()}"
         print(f"ERROR in get_combined_vessel_data: {error_msg}")
         return jsonify({'error': str(e), 'details': error_msg}), 500
-    finally:
-        if conn:
-            conn.close()
 
 
 @app.route('/ships/api/visualization/fleet-network')
@@ -1623,193 +2528,155 @@ def get_fleet_network():
     project_root = Path(__file__).parent.parent.parent
     db_path = project_root / DB_NAME
     
-    conn = None
     try:
-        conn = sqlite3.connect(db_path, timeout=30)
-        ensure_econowind_column(conn)
-        cursor = conn.cursor()
-        
-        # Get vessels with both AIS and emissions data
-        cursor.execute('''
-            SELECT 
-                v.mmsi, v.name, v.imo, v.length, v.ship_type, v.flag_state,
-                COALESCE(v.signatory_company, e.company_name) as company,
-                e.total_co2_emissions, e.total_fuel_consumption,
-                e.avg_co2_per_distance, e.econowind_fit_score
-            FROM vessels_static v
-            INNER JOIN eu_mrv_emissions e ON v.imo = e.imo
-            WHERE e.total_co2_emissions IS NOT NULL
-              AND v.length IS NOT NULL
-              AND COALESCE(v.signatory_company, e.company_name) IS NOT NULL
-            ORDER BY e.total_co2_emissions DESC
-            LIMIT 500
-        ''')
-        
-        vessels = cursor.fetchall()
-        
-        # Build nodes and links
-        nodes = []
-        links = []
-        companies = {}
-        
-        for vessel in vessels:
-            mmsi, name, imo, length, ship_type, flag, company, co2, fuel, co2_per_nm, fit_score = vessel
+        with get_pool(db_path).acquire() as conn:
+            ensure_schema(conn, db_path)
+            cursor = conn.cursor()
             
-            # Track companies
-            if company not in companies:
-                companies[company] = {
-                    'total_co2': 0,
-                    'vessel_count': 0,
-                    'total_length': 0
-                }
+            # Get vessels with both AIS and emissions data
+            cursor.execute('''
+                SELECT 
+                    v.mmsi, v.name, v.imo, v.length, v.ship_type, v.flag_state,
+                    COALESCE(v.signatory_company, e.company_name) as company,
+                    e.total_co2_emissions, e.total_fuel_consumption,
+                    e.avg_co2_per_distance, e.econowind_fit_score
+                FROM vessels_static v
+                INNER JOIN eu_mrv_emissions e ON v.imo = e.imo
+                WHERE e.total_co2_emissions IS NOT NULL
+                  AND v.length IS NOT NULL
+                  AND COALESCE(v.signatory_company, e.company_name) IS NOT NULL
+                ORDER BY e.total_co2_emissions DESC
+                LIMIT 500
+            ''')
             
-            companies[company]['total_co2'] += co2 or 0
-            companies[company]['vessel_count'] += 1
-            companies[company]['total_length'] += length or 0
+            vessels = cursor.fetchall()
             
-            # Create ship node
-            nodes.append({
-                'id': f'ship_{mmsi}',
-                'type': 'ship',
-                'mmsi': mmsi,
-                'name': name or 'Unknown',
-                'imo': imo,
-                'length': length,
-                'ship_type': ship_type,
-                'flag_state': flag,
-                'company': company,
-                'co2': co2,
-                'fuel': fuel,
-                'co2_per_nm': co2_per_nm,
-                'fit_score': fit_score or 0
-            })
+            # Build nodes and links
+            nodes = []
+            links = []
+            companies = {}
             
-            # Create link from ship to company
-            links.append({
-                'source': f'ship_{mmsi}',
-                'target': f'company_{company}'
-            })
-        
-        # Create company nodes
-        for company_name, stats in companies.items():
-            nodes.append({
-                'id': f'company_{company_name}',
-                'type': 'company',
-                'name': company_name,
-                'vessel_count': stats['vessel_count'],
-                'total_co2': stats['total_co2'],
-                'avg_vessel_length': stats['total_length'] / stats['vessel_count'] if stats['vessel_count'] > 0 else 0
+            for vessel in vessels:
+                mmsi, name, imo, length, ship_type, flag, company, co2, fuel, co2_per_nm, fit_score = vessel
+                
+                # Track companies
+                if company not in companies:
+                    companies[company] = {
+                        'total_co2': 0,
+                        'vessel_count': 0,
+                        'total_length': 0
+                    }
+                
+                companies[company]['total_co2'] += co2 or 0
+                companies[company]['vessel_count'] += 1
+                companies[company]['total_length'] += length or 0
+                
+                # Create ship node
+                nodes.append({
+                    'id': f'ship_{mmsi}',
+                    'type': 'ship',
+                    'mmsi': mmsi,
+                    'name': name or 'Unknown',
+                    'imo': imo,
+                    'length': length,
+                    'ship_type': ship_type,
+                    'flag_state': flag,
+                    'company': company,
+                    'co2': co2,
+                    'fuel': fuel,
+                    'co2_per_nm': co2_per_nm,
+                    'fit_score': fit_score or 0
+                })
+                
+                # Create link from ship to company
+                links.append({
+                    'source': f'ship_{mmsi}',
+                    'target': f'company_{company}'
+                })
+            
+            # Create company nodes
+            for company_name, stats in companies.items():
+                nodes.append({
+                    'id': f'company_{company_name}',
+                    'type': 'company',
+                    'name': company_name,
+                    'vessel_count': stats['vessel_count'],
+                    'total_co2': stats['total_co2'],
+                    'avg_vessel_length': stats['total_length'] / stats['vessel_count'] if stats['vessel_count'] > 0 else 0
+                })
+            
+            return jsonify({
+                'nodes': nodes,
+                'links': links,
+                'stats': {
+                    'total_ships': len(vessels),
+                    'total_companies': len(companies),
+                    'total_co2': sum(c['total_co2'] for c in companies.values())
+                }
             })
         
-        return jsonify({
-            'nodes': nodes,
-            'links': links,
-            'stats': {
-                'total_ships': len(vessels),
-                'total_companies': len(companies),
-                'total_co2': sum(c['total_co2'] for c in companies.values())
-            }
-        })
-        
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        if conn:
-            conn.close()
+
+
+MATCH_STATS_QUERY = '''
+    WITH matched AS (
+        SELECT v.imo, v.last_updated
+        FROM vessels_static v
+        INNER JOIN eu_mrv_emissions e ON v.imo = e.imo
+        WHERE v.imo IS NOT NULL AND v.imo > 0
+    )
+    SELECT
+        (SELECT COUNT(*) FROM vessels_static) AS total_ais,
+        (SELECT COUNT(*) FROM vessels_static WHERE imo IS NOT NULL AND imo > 0) AS total_ais_with_imo,
+        (SELECT COUNT(*) FROM eu_mrv_emissions) AS total_emissions,
+        (SELECT COUNT(DISTINCT imo) FROM matched) AS matched,
+        (SELECT COUNT(*)
+         FROM eu_mrv_emissions e
+         LEFT JOIN vessels_static v ON e.imo = v.imo
+         WHERE v.imo IS NULL) AS emissions_only,
+        (SELECT COUNT(*)
+         FROM vessels_static v
+         LEFT JOIN eu_mrv_emissions e ON v.imo = e.imo
+         WHERE v.imo IS NOT NULL AND v.imo > 0 AND e.imo IS NULL) AS ais_only,
+        (SELECT COUNT(DISTINCT imo) FROM matched
+         WHERE last_updated > datetime('now', '-1 day')) AS recent_matches
+'''
 
 
 @app.route('/ships/api/emissions/match-stats')
+@ttl_cache(AGGREGATE_CACHE_TTL)
 def get_match_statistics():
     """Get real-time matching statistics between AIS and emissions data."""
-    global _match_stats_cache, _match_stats_cache_time
-    
-    # Return cached result if still valid
-    current_time = time.time()
-    if _match_stats_cache and (current_time - _match_stats_cache_time) < _match_stats_cache_ttl:
-        return jsonify(_match_stats_cache)
-    
     project_root = Path(__file__).parent.parent.parent
     db_path = project_root / DB_NAME
     
-    conn = None
     try:
-        conn = sqlite3.connect(db_path, timeout=30)
+        conn = get_ro_conn(db_path)
         cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
         
-        # Ensure indexes exist for performance
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_vessels_static_imo ON vessels_static(imo)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_mrv_imo ON eu_mrv_emissions(imo)')
-        conn.commit()
-        
-        # Optimized queries using LEFT JOINs instead of NOT EXISTS (much faster with indexes)
-        cursor.execute('SELECT COUNT(*) FROM vessels_static')
-        total_ais = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT COUNT(*) FROM vessels_static WHERE imo IS NOT NULL AND imo > 0')
-        total_ais_with_imo = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT COUNT(*) FROM eu_mrv_emissions')
-        total_emissions = cursor.fetchone()[0]
-        
-        # Matched vessels - use INNER JOIN (fast with index)
-        cursor.execute('''
-            SELECT COUNT(DISTINCT v.imo)
-            FROM vessels_static v
-            INNER JOIN eu_mrv_emissions e ON v.imo = e.imo
-            WHERE v.imo IS NOT NULL AND v.imo > 0
-        ''')
-        matched = cursor.fetchone()[0]
-        
-        # Emissions only - use LEFT JOIN (faster than NOT EXISTS)
-        cursor.execute('''
-            SELECT COUNT(*)
-            FROM eu_mrv_emissions e
-            LEFT JOIN vessels_static v ON e.imo = v.imo
-            WHERE v.imo IS NULL
-        ''')
-        emissions_only = cursor.fetchone()[0]
-        
-        # AIS only - use LEFT JOIN (faster than NOT EXISTS)
-        cursor.execute('''
-            SELECT COUNT(*)
-            FROM vessels_static v
-            LEFT JOIN eu_mrv_emissions e ON v.imo = e.imo
-            WHERE v.imo IS NOT NULL AND v.imo > 0 AND e.imo IS NULL
-        ''')
-        ais_only = cursor.fetchone()[0]
-        
-        # Recent matches - simplified query
-        cursor.execute('''
-            SELECT COUNT(DISTINCT v.imo)
-            FROM vessels_static v
-            INNER JOIN eu_mrv_emissions e ON v.imo = e.imo
-            WHERE v.imo IS NOT NULL AND v.imo > 0
-            AND v.last_updated > datetime('now', '-1 day')
-        ''')
-        recent_matches = cursor.fetchone()[0]
+        # All counts in one statement; the matched CTE is shared by the two match counts
+        cursor.execute(MATCH_STATS_QUERY)
+        counts = cursor.fetchone()
+        total_ais_with_imo = counts['total_ais_with_imo']
+        matched = counts['matched']
         
         result = {
-            'total_ais_vessels': total_ais,
+            'total_ais_vessels': counts['total_ais'],
             'total_ais_with_imo': total_ais_with_imo,
-            'total_emissions_database': total_emissions,
+            'total_emissions_database': counts['total_emissions'],
             'matched_vessels': matched,
             'match_rate_percentage': round((matched / total_ais_with_imo * 100), 2) if total_ais_with_imo > 0 else 0,
-            'ais_only': ais_only,
-            'emissions_only': emissions_only,
-            'recent_matches_24h': recent_matches,
-            'potential_new_matches': ais_only  # Vessels that could potentially be matched
+            'ais_only': counts['ais_only'],
+            'emissions_only': counts['emissions_only'],
+            'recent_matches_24h': counts['recent_matches'],
+            'potential_new_matches': counts['ais_only']  # Vessels that could potentially be matched
         }
         
-        # Cache the result
-        _match_stats_cache = result
-        _match_stats_cache_time = current_time
-        
         return jsonify(result)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        if conn:
-            conn.close()
 
 
 @app.route('/ships/api/statistics/ship-types')
@@ -1818,69 +2685,64 @@ def get_ship_type_statistics():
     project_root = Path(__file__).parent.parent.parent
     db_path = project_root / DB_NAME
     
-    conn = None
     try:
-        conn = sqlite3.connect(db_path, timeout=30)
-        conn.execute('PRAGMA journal_mode=WAL')
-        cursor = conn.cursor()
-        
-        # Get breakdown by AIS ship type
-        cursor.execute('''
-            SELECT ship_type, COUNT(*) as count
-            FROM vessels_static
-            WHERE ship_type IS NOT NULL
-            GROUP BY ship_type
-            ORDER BY count DESC
-        ''')
-        ais_types = cursor.fetchall()
-        
-        # Get breakdown by detailed ship type from EU MRV
-        cursor.execute('''
-            SELECT detailed_ship_type, COUNT(*) as count
-            FROM vessels_static
-            WHERE detailed_ship_type IS NOT NULL
-            GROUP BY detailed_ship_type
-            ORDER BY count DESC
-        ''')
-        detailed_types = cursor.fetchall()
-        
-        # Get vessels without detailed type but with IMO
-        cursor.execute('''
-            SELECT COUNT(*)
-            FROM vessels_static
-            WHERE imo IS NOT NULL AND imo > 0
-            AND detailed_ship_type IS NULL
-        ''')
-        missing_detailed = cursor.fetchone()[0]
-        
-        # Format AIS types with names
-        ais_breakdown = []
-        for ship_type, count in ais_types:
-            ais_breakdown.append({
-                'code': ship_type,
-                'name': get_ship_type_name(ship_type),
-                'count': count
-            })
-        
-        # Format detailed types
-        detailed_breakdown = []
-        for ship_type, count in detailed_types:
-            detailed_breakdown.append({
-                'type': ship_type,
-                'count': count
+        with get_pool(db_path).acquire() as conn:
+            cursor = conn.cursor()
+            
+            # Get breakdown by AIS ship type
+            cursor.execute('''
+                SELECT ship_type, COUNT(*) as count
+                FROM vessels_static
+                WHERE ship_type IS NOT NULL
+                GROUP BY ship_type
+                ORDER BY count DESC
+            ''')
+            ais_types = cursor.fetchall()
+            
+            # Get breakdown by detailed ship type from EU MRV
+            cursor.execute('''
+                SELECT detailed_ship_type, COUNT(*) as count
+                FROM vessels_static
+                WHERE detailed_ship_type IS NOT NULL
+                GROUP BY detailed_ship_type
+                ORDER BY count DESC
+            ''')
+            detailed_types = cursor.fetchall()
+            
+            # Get vessels without detailed type but with IMO
+            cursor.execute('''
+                SELECT COUNT(*)
+                FROM vessels_static
+                WHERE imo IS NOT NULL AND imo > 0
+                AND detailed_ship_type IS NULL
+            ''')
+            missing_detailed = cursor.fetchone()[0]
+            
+            # Format AIS types with names
+            ais_breakdown = []
+            for ship_type, count in ais_types:
+                ais_breakdown.append({
+                    'code': ship_type,
+                    'name': get_ship_type_name(ship_type),
+                    'count': count
+                })
+            
+            # Format detailed types
+            detailed_breakdown = []
+            for ship_type, count in detailed_types:
+                detailed_breakdown.append({
+                    'type': ship_type,
+                    'count': count
+                })
+            
+            return jsonify({
+                'ais_types': ais_breakdown,
+                'detailed_types': detailed_breakdown,
+                'vessels_missing_detailed_type': missing_detailed,
+                'total_vessels': sum(t['count'] for t in ais_breakdown)
             })
-        
-        return jsonify({
-            'ais_types': ais_breakdown,
-            'detailed_types': detailed_breakdown,
-            'vessels_missing_detailed_type': missing_detailed,
-            'total_vessels': sum(t['count'] for t in ais_breakdown)
-        })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        if conn:
-            conn.close()
 
 
 @app.route('/ships/api/detailed-ship-types')
@@ -1889,43 +2751,38 @@ def get_detailed_ship_types():
     project_root = Path(__file__).parent.parent.parent
     db_path = project_root / DB_NAME
     
-    conn = None
     try:
-        conn = sqlite3.connect(db_path, timeout=30)
-        conn.execute('PRAGMA journal_mode=WAL')
-        cursor = conn.cursor()
-        
-        # Check if column exists first
-        cursor.execute("PRAGMA table_info(vessels_static)")
-        columns = [row[1] for row in cursor.fetchall()]
-        
-        if 'detailed_ship_type' not in columns:
-            print("Warning: detailed_ship_type column does not exist yet")
-            return jsonify([])  # Return empty array
-        
-        # Get unique detailed ship types with counts
-        cursor.execute('''
-            SELECT detailed_ship_type, COUNT(*) as count
-            FROM vessels_static
-            WHERE detailed_ship_type IS NOT NULL
-            GROUP BY detailed_ship_type
-            ORDER BY detailed_ship_type
-        ''')
-        
-        types = []
-        for ship_type, count in cursor.fetchall():
-            types.append({
-                'name': ship_type,
-                'count': count
-            })
-        
-        return jsonify(types)
+        with get_pool(db_path).acquire() as conn:
+            cursor = conn.cursor()
+            
+            # Check if column exists first
+            cursor.execute("PRAGMA table_info(vessels_static)")
+            columns = [row[1] for row in cursor.fetchall()]
+            
+            if 'detailed_ship_type' not in columns:
+                print("Warning: detailed_ship_type column does not exist yet")
+                return jsonify([])  # Return empty array
+            
+            # Get unique detailed ship types with counts
+            cursor.execute('''
+                SELECT detailed_ship_type, COUNT(*) as count
+                FROM vessels_static
+                WHERE detailed_ship_type IS NOT NULL
+                GROUP BY detailed_ship_type
+                ORDER BY detailed_ship_type
+            ''')
+            
+            types = []
+            for ship_type, count in cursor.fetchall():
+                types.append({
+                    'name': ship_type,
+                    'count': count
+                })
+            
+            return jsonify(types)
     except Exception as e:
         print(f"Error in get_detailed_ship_types: {e}")
         return jsonify([]), 200  # Return empty array instead of error
-    finally:
-        if conn:
-            conn.close()
 
 
 @app.route('/ships/api/vessel/<int:mmsi>/photo')
@@ -1956,54 +2813,50 @@ def get_vessel_wind_tech(mmsi):
     project_root = Path(__file__).parent.parent.parent
     db_path = project_root / DB_NAME
     
-    conn = None
     try:
-        conn = sqlite3.connect(db_path, timeout=30)
-        cursor = conn.cursor()
-        
-        # Try MMSI-based table first
-        cursor.execute('''
-            SELECT technology_installed, installation_year, installation_type
-            FROM wind_propulsion_mmsi
-            WHERE mmsi = ?
-        ''', (mmsi,))
-        
-        result = cursor.fetchone()
-        
-        if result:
-            return jsonify({
-                'technology': result[0],
-                'year': result[1],
-                'type': result[2],
-                'found': True
-            })
-        
-        # Fallback to name-based table
-        cursor.execute('''
-            SELECT w.technology_installed, w.installation_year, w.installation_type
-            FROM wind_propulsion w
-            INNER JOIN vessels_static v ON UPPER(TRIM(v.name)) = UPPER(TRIM(w.vessel_name))
-            WHERE v.mmsi = ?
-        ''', (mmsi,))
-        
-        result = cursor.fetchone()
-        
-        if result:
-            return jsonify({
-                'technology': result[0],
-                'year': result[1],
-                'type': result[2],
-                'found': True
-            })
-        
-        return jsonify({'found': False})
+        with get_pool(db_path).acquire() as conn:
+            cursor = conn.cursor()
+            
+            # Try MMSI-based table first
+            cursor.execute('''
+                SELECT technology_installed, installation_year, installation_type
+                FROM wind_propulsion_mmsi
+                WHERE mmsi = ?
+            ''', (mmsi,))
+            
+            result = cursor.fetchone()
+            
+            if result:
+                return jsonify({
+                    'technology': result[0],
+                    'year': result[1],
+                    'type': result[2],
+                    'found': True
+                })
+            
+            # Fallback to name-based table
+            cursor.execute('''
+                SELECT w.technology_installed, w.installation_year, w.installation_type
+                FROM wind_propulsion w
+                INNER JOIN vessels_static v ON UPPER(TRIM(v.name)) = UPPER(TRIM(w.vessel_name))
+                WHERE v.mmsi = ?
+            ''', (mmsi,))
+            
+            result = cursor.fetchone()
+            
+            if result:
+                return jsonify({
+                    'technology': result[0],
+                    'year': result[1],
+                    'type': result[2],
+                    'found': True
+                })
+            
+            return jsonify({'found': False})
         
     except Exception as e:
         print(f"Error fetching wind tech for MMSI {mmsi}: {e}")
         return jsonify({'error': str(e), 'found': False}), 500
-    finally:
-        if conn:
-            conn.close()
 
 
 # ==================== INTELLIGENCE DASHBOARD ROUTES ====================
@@ -2804,7 +3657,7 @@ def get_ml_wasp_data():
         if not db_path.exists():
             return jsonify({'error': 'Database not found', 'wasp_companies': {}}), 404
         
-        conn = sqlite3.connect(db_path)
+        conn = get_ro_conn(db_path)
         cursor = conn.cursor()
         
         wasp_companies = {}
@@ -2844,7 +3697,6 @@ def get_ml_wasp_data():
                 except Exception:
                     pass
         
-        conn.close()
         return jsonify({'wasp_companies': wasp_companies})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -2858,57 +3710,52 @@ def get_technical_fit_vessels():
     if not db_path.exists():
         db_path = project_root / DB_NAME
     
-    conn = None
     try:
         if not db_path.exists():
             return jsonify({'error': 'Database not found'}), 404
         
-        conn = sqlite3.connect(str(db_path), timeout=30)
-        conn.execute('PRAGMA journal_mode=WAL')
-        ensure_technical_fit_score_column(conn)
-        cursor = conn.cursor()
-        
-        # Get vessels with technical fit scores and emissions data
-        cursor.execute('''
-            SELECT 
-                v.mmsi,
-                v.name,
-                v.detailed_ship_type,
-                v.length,
-                v.flag_state,
-                COALESCE(v.signatory_company, e.company_name) as company,
-                e.total_co2_emissions,
-                v.technical_fit_score
-            FROM vessels_static v
-            INNER JOIN eu_mrv_emissions e ON v.imo = e.imo
-            WHERE v.technical_fit_score IS NOT NULL
-              AND e.total_co2_emissions IS NOT NULL
-            ORDER BY v.technical_fit_score DESC, e.total_co2_emissions DESC
-            LIMIT 5000
-        ''')
-        
-        rows = cursor.fetchall()
-        results = []
-        for row in rows:
-            results.append({
-                'MMSI': row[0],
-                'Name': row[1] or 'Unknown',
-                'Type': row[2] or 'Cargo',
-                'Length': row[3],
-                'Flag': row[4] or 'Unknown',
-                'Company': row[5] or '',
-                'CO2': row[6],
-                'Technical Fit': row[7]
-            })
-        
-        return jsonify(results)
+        with get_pool(db_path).acquire() as conn:
+            ensure_schema(conn, db_path)
+            cursor = conn.cursor()
+            
+            # Get vessels with technical fit scores and emissions data
+            cursor.execute('''
+                SELECT 
+                    v.mmsi,
+                    v.name,
+                    v.detailed_ship_type,
+                    v.length,
+                    v.flag_state,
+                    COALESCE(v.signatory_company, e.company_name) as company,
+                    e.total_co2_emissions,
+                    v.technical_fit_score
+                FROM vessels_static v
+                INNER JOIN eu_mrv_emissions e ON v.imo = e.imo
+                WHERE v.technical_fit_score IS NOT NULL
+                  AND e.total_co2_emissions IS NOT NULL
+                ORDER BY v.technical_fit_score DESC, e.total_co2_emissions DESC
+                LIMIT 5000
+            ''')
+            
+            rows = cursor.fetchall()
+            results = []
+            for row in rows:
+                results.append({
+                    'MMSI': row[0],
+                    'Name': row[1] or 'Unknown',
+                    'Type': row[2] or 'Cargo',
+                    'Length': row[3],
+                    'Flag': row[4] or 'Unknown',
+                    'Company': row[5] or '',
+                    'CO2': row[6],
+                    'Technical Fit': row[7]
+                })
+            
+            return jsonify(results)
     except Exception as e:
         import traceback
         print(f"Error in get_technical_fit_vessels: {e}\n{traceback.format_exc()}")
         return jsonify({'error': str(e)}), 500
-    finally:
-        if conn:
-            conn.close()
 
 
 @app.route('/ships/api/target-vessels/company-scores')
@@ -2919,86 +3766,81 @@ def get_company_waps_scores():
     if not db_path.exists():
         db_path = project_root / DB_NAME
     
-    conn = None
     try:
         if not db_path.exists():
             return jsonify({'error': 'Database not found'}), 404
         
-        conn = sqlite3.connect(str(db_path), timeout=30)
-        conn.execute('PRAGMA journal_mode=WAL')
-        cursor = conn.cursor()
-        
-        # Get companies with WASP adoption status
-        # Check if they have wind-assisted vessels
-        cursor.execute('''
-            SELECT DISTINCT
-                COALESCE(v.signatory_company, e.company_name) as company_name,
-                CASE WHEN v.wind_assisted = 1 THEN 1 ELSE 0 END as waps_adopted
-            FROM eu_mrv_emissions e
-            LEFT JOIN vessels_static v ON e.imo = v.imo
-            WHERE COALESCE(v.signatory_company, e.company_name) IS NOT NULL
-              AND COALESCE(v.signatory_company, e.company_name) != ''
-        ''')
-        
-        company_adoption = {}
-        for row in cursor.fetchall():
-            company = row[0]
-            if company not in company_adoption:
-                company_adoption[company] = {'adopted': 0, 'probability': None}
-            if row[1] == 1:
-                company_adoption[company]['adopted'] = 1
-        
-        # Try to load ML predictions if available
-        predictions_file = project_root / 'data' / 'company_predictions.json'
-        ml_scores = {}
-        if predictions_file.exists():
-            try:
-                import json
-                with open(predictions_file, 'r', encoding='utf-8') as f:
-                    predictions_data = json.load(f)
-                predictions = predictions_data.get('predictions', {})
+        with get_pool(db_path).acquire() as conn:
+            cursor = conn.cursor()
+            
+            # Get companies with WASP adoption status
+            # Check if they have wind-assisted vessels
+            cursor.execute('''
+                SELECT DISTINCT
+                    COALESCE(v.signatory_company, e.company_name) as company_name,
+                    CASE WHEN v.wind_assisted = 1 THEN 1 ELSE 0 END as waps_adopted
+                FROM eu_mrv_emissions e
+                LEFT JOIN vessels_static v ON e.imo = v.imo
+                WHERE COALESCE(v.signatory_company, e.company_name) IS NOT NULL
+                  AND COALESCE(v.signatory_company, e.company_name) != ''
+            ''')
+            
+            company_adoption = {}
+            for row in cursor.fetchall():
+                company = row[0]
+                if company not in company_adoption:
+                    company_adoption[company] = {'adopted': 0, 'probability': None}
+                if row[1] == 1:
+                    company_adoption[company]['adopted'] = 1
+            
+            # Try to load ML predictions if available
+            predictions_file = project_root / 'data' / 'company_predictions.json'
+            ml_scores = {}
+            if predictions_file.exists():
+                try:
+                    import json
+                    with open(predictions_file, 'r', encoding='utf-8') as f:
+                        predictions_data = json.load(f)
+                    predictions = predictions_data.get('predictions', {})
+                    
+                    # Match predictions to companies (normalize names for matching)
+                    for pred_company, pred_data in predictions.items():
+                        # Try to match by normalized name
+                        normalized_pred = pred_company.lower().strip()
+                        for db_company in company_adoption.keys():
+                            normalized_db = db_company.lower().strip()
+                            if normalized_pred == normalized_db or normalized_pred in normalized_db or normalized_db in normalized_pred:
+                                wasp_pred = pred_data.get('wasp_adoption', {})
+                                if wasp_pred:
+                                    # Convert probability (0-1) to percentile (0-100)
+                                    probability = wasp_pred.get('probability', 0.5)
+                                    ml_scores[db_company] = probability * 100
+                                break
+                except Exception as e:
+                    print(f"Error loading ML predictions: {e}")
+            
+            # Build results
+            results = []
+            for company, data in company_adoption.items():
+                # Use ML score if available, otherwise use adoption status as proxy
+                if company in ml_scores:
+                    score = ml_scores[company]
+                elif data['adopted'] == 1:
+                    score = 75.0  # Adopters get higher score
+                else:
+                    score = 25.0  # Non-adopters get lower score
                 
-                # Match predictions to companies (normalize names for matching)
-                for pred_company, pred_data in predictions.items():
-                    # Try to match by normalized name
-                    normalized_pred = pred_company.lower().strip()
-                    for db_company in company_adoption.keys():
-                        normalized_db = db_company.lower().strip()
-                        if normalized_pred == normalized_db or normalized_pred in normalized_db or normalized_db in normalized_pred:
-                            wasp_pred = pred_data.get('wasp_adoption', {})
-                            if wasp_pred:
-                                # Convert probability (0-1) to percentile (0-100)
-                                probability = wasp_pred.get('probability', 0.5)
-                                ml_scores[db_company] = probability * 100
-                            break
-            except Exception as e:
-                print(f"Error loading ML predictions: {e}")
-        
-        # Build results
-        results = []
-        for company, data in company_adoption.items():
-            # Use ML score if available, otherwise use adoption status as proxy
-            if company in ml_scores:
-                score = ml_scores[company]
-            elif data['adopted'] == 1:
-                score = 75.0  # Adopters get higher score
-            else:
-                score = 25.0  # Non-adopters get lower score
+                results.append({
+                    'company_name': company,
+                    'waps_adopted': data['adopted'],
+                    'waps_score_percentile': score
+                })
             
-            results.append({
-                'company_name': company,
-                'waps_adopted': data['adopted'],
-                'waps_score_percentile': score
-            })
-        
-        return jsonify(results)
+            return jsonify(results)
     except Exception as e:
         import traceback
         print(f"Error in get_company_waps_scores: {e}\n{traceback.format_exc()}")
         return jsonify({'error': str(e)}), 500
-    finally:
-        if conn:
-            conn.close()
 
 
 @app.route('/ships/api/wind-alignment/<int:mmsi>')
@@ -3044,14 +3886,51 @@ def get_top_wind_alignment_vessels():
         return jsonify({'error': str(e)}), 500
 
 
-if __name__ == '__main__':
+SERVER_BIND = '0.0.0.0:5000'
+SERVER_THREADS = 64
+
+
+def start_background_services():
+    """Start tracking, maintenance and live-update threads (after init_db() has run)."""
+    threading.Thread(target=_db_maintenance, daemon=True).start()
+    threading.Thread(target=_company_stats_refresher, daemon=True).start()
+    
     # Start tracking in background
     tracking_thread = threading.Thread(target=start_tracking, daemon=True)
     tracking_thread.start()
     
-    # Give tracking a moment to initialize
-    time.sleep(2)
+    # Push batched live position updates to browsers
+    socketio.start_background_task(_update_flusher)
+
+
+class GunicornServer(BaseApplication):
+    """
+    Serve the app from a single gunicorn gthread worker.
+    
+    One worker keeps vessel_positions and the Socket.IO clients in one process;
+    its thread pool lets /api requests run concurrently on pooled connections.
+    init_db() runs in the master before the fork (a long first-boot migration
+    can't trip the worker timeout), and only the threads start in the worker.
+    """
+    
+    def __init__(self, application):
+        self.application = application
+        super().__init__()
+    
+    def load_config(self):
+        self.cfg.set('bind', SERVER_BIND)
+        self.cfg.set('workers', 1)
+        self.cfg.set('worker_class', 'gthread')
+        self.cfg.set('threads', SERVER_THREADS)
+        # Socket.IO long-polling and CSV exports hold requests open
+        self.cfg.set('timeout', 120)
+        self.cfg.set('post_worker_init', lambda worker: start_background_services())
     
+    def load(self):
+        return self.application
+
+
+if __name__ == '__main__':
     print("\n" + "="*70)
     print("VESSEL TRACKER WEB INTERFACE")
     print("="*70)
@@ -3059,5 +3938,18 @@ if __name__ == '__main__':
     print("  http://localhost:5000")
     print("="*70 + "\n")
     
+    # One-time migrations (indexes, FTS, vessel_latest seed, ANALYZE) before serving
+    init_db()
+    
     # Start Flask server
-    socketio.run(app, host='0.0.0.0', port=5000, debug=False, allow_unsafe_werkzeug=True)
+    if GUNICORN_AVAILABLE:
+        # No SQLite connection may cross the fork into the worker
+        close_pools()
+        GunicornServer(app).run()
+    else:
+        print("gunicorn not installed - using the Werkzeug development server")
+        start_background_services()
+        
+        # Give tracking a moment to initialize
+        time.sleep(2)
+        socketio.run(app, host='0.0.0.0', port=5000, debug=False, allow_unsafe_werkzeug=True)
@@ -78,7 +78,6 @@ def create_mrv_table(conn):
     ''')
     
     # Create indexes for faster queries
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_mrv_imo ON eu_mrv_emissions(imo)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_mrv_company ON eu_mrv_emissions(company_name)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_mrv_period ON eu_mrv_emissions(reporting_period)')
     
@@ -0,0 +1,307 @@
+"""
+Tests for the web tracker API routes.
+
+Each test runs the Flask app against a small temporary copy of
+vessel_static_data.db.
+"""
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from src.services import web_tracker
+
+
+SCHEMA = '''
+CREATE TABLE vessels_static (
+    mmsi INTEGER PRIMARY KEY UNIQUE NOT NULL,
+    name TEXT,
+    ship_type INTEGER,
+    detailed_ship_type TEXT,
+    length INTEGER,
+    beam INTEGER,
+    imo INTEGER,
+    call_sign TEXT,
+    flag_state TEXT,
+    signatory_company TEXT,
+    destination TEXT,
+    eta TEXT,
+    draught REAL,
+    nav_status INTEGER,
+    last_updated TEXT NOT NULL,
+    wind_assisted INTEGER DEFAULT 0
+);
+CREATE TABLE vessel_positions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    mmsi INTEGER NOT NULL,
+    latitude REAL NOT NULL,
+    longitude REAL NOT NULL,
+    sog REAL,
+    cog REAL,
+    heading INTEGER,
+    timestamp TEXT NOT NULL
+);
+CREATE TABLE eu_mrv_emissions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    imo INTEGER NOT NULL UNIQUE,
+    vessel_name TEXT,
+    company_name TEXT,
+    total_co2_emissions REAL
+);
+'''
+
+# (mmsi, name, ship_type, length, signatory_company)
+VESSELS = [
+    (235000001, 'MAERSK ESSEX', 70, 242, 'Maersk'),
+    (235000002, 'MAERSK 1', 60, 200, 'Maersk'),
+    (244000003, 'STENA 2000', 80, 183, 'Stena 2000 Shipping'),
+    (257000004, 'NORDIC STAR', 70, 150, 'Nordic & Co'),
+]
+
+
+@pytest.fixture
+def tracker(tmp_path, monkeypatch):
+    """web_tracker with DB_NAME pointing at a fresh test database."""
+    db_path = tmp_path / "vessel_static_data.db"
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    conn.executemany(
+        "INSERT INTO vessels_static (mmsi, name, ship_type, length, signatory_company, flag_state, last_updated) "
+        "VALUES (?, ?, ?, ?, ?, 'NL', datetime('now'))",
+        VESSELS
+    )
+    conn.commit()
+    conn.close()
+    
+    # Absolute, so project_root / DB_NAME resolves to the test database
+    monkeypatch.setattr(web_tracker, 'DB_NAME', str(db_path))
+    web_tracker._response_cache.clear()
+    web_tracker.init_db()
+    return web_tracker
+
+
+@pytest.fixture
+def client(tracker):
+    return tracker.app.test_client()
+
+
+def sql_query(client, query):
+    response = client.post('/ships/api/sql/query', json={'query': query})
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()['rows']
+
+
+def test_sql_query_maps_ship_type_in_every_union_branch(client):
+    """Compound selects are mapped after fetching, so no branch keeps raw codes."""
+    rows = sql_query(client, '''
+        SELECT ship_type FROM vessels_static WHERE mmsi = 235000001
+        UNION ALL
+        SELECT ship_type FROM vessels_static WHERE mmsi = 244000003
+    ''')
+    
+    assert rows == [['Cargo'], ['Tanker']]
+
+
+def test_sql_query_positional_order_by_sorts_on_ship_type_code(client):
+    """ORDER BY 1 / GROUP BY 1 still sort and group on the numeric code, not the name."""
+    rows = sql_query(client, '''
+        SELECT ship_type, COUNT(*) FROM vessels_static
+        GROUP BY 1
+        ORDER BY 1 DESC
+    ''')
+    
+    assert rows == [['Tanker', 1], ['Cargo', 2], ['Passenger', 1]]
+
+
+@pytest.mark.parametrize('fts', [True, False], ids=['fts', 'like'])
+def test_digit_search_matches_mmsi_prefix_and_names(tracker, client, monkeypatch, fts):
+    """Digit-only searches match MMSI prefixes as well as names/companies containing digits."""
+    if not fts:
+        monkeypatch.setattr(tracker, '_fts_ready', set())
+    
+    def search(term):
+        response = client.get('/ships/api/database/vessels', query_string={'search': term})
+        assert response.status_code == 200
+        return sorted(vessel['mmsi'] for vessel in response.get_json())
+    
+    assert search('235') == [235000001, 235000002]
+    assert search('2000') == [244000003]
+    assert search('1') == [235000002]
+
+
+def test_punctuation_search_falls_back_to_like(client):
+    """Searches with nothing for the FTS tokenizer to index still match via LIKE."""
+    response = client.get('/ships/api/database/vessels', query_string={'search': '&'})
+    
+    assert response.status_code == 200
+    assert [vessel['mmsi'] for vessel in response.get_json()] == [257000004]
+
+
+def test_pool_connection_returned_after_error(tmp_path):
+    """A connection goes back to the pool even when the with-block raises."""
+    pool = web_tracker.ConnectionPool(tmp_path / "pool.db", size=1)
+    
+    with pytest.raises(RuntimeError):
+        with pool.acquire() as conn:
+            first = conn
+            raise RuntimeError("query failed")
+    
+    # Size 1: only succeeds (without waiting) if the connection was returned
+    with pool.acquire() as conn:
+        assert conn is first
+
+
+@pytest.fixture
+def held_acquires(monkeypatch):
+    """
+    Keep every ConnectionPool.acquire() context alive for the test.
+    
+    Otherwise a leaked context is garbage-collected right away and its finally
+    block returns the connection, hiding a missing release.
+    """
+    held = []
+    acquire = web_tracker.ConnectionPool.acquire
+    
+    def holding_acquire(self):
+        context = acquire(self)
+        held.append(context)
+        return context
+    
+    monkeypatch.setattr(web_tracker.ConnectionPool, 'acquire', holding_acquire)
+    return held
+
+
+def ro_pool_idle(tracker):
+    """(idle, created) for the read-only pool the routes borrow from."""
+    pool = tracker.get_pool(Path(tracker.DB_NAME), readonly=True)
+    return pool._idle.qsize(), pool._created
+
+
+@pytest.mark.parametrize('query, status', [
+    ('SELECT mmsi FROM vessels_static', 200),
+    ('SELECT nothing FROM nowhere', 400),
+], ids=['ok', 'sql-error'])
+def test_request_returns_ro_conn_to_pool(tracker, client, held_acquires, query, status):
+    """get_ro_conn connections are released by teardown_appcontext after each request."""
+    response = client.post('/ships/api/sql/query', json={'query': query})
+    
+    assert response.status_code == status
+    idle, created = ro_pool_idle(tracker)
+    assert created >= 1
+    assert idle == created
+
+
+def test_ro_conn_released_when_request_raises(tracker, held_acquires):
+    """An exception escaping the request still returns its connection."""
+    db_path = Path(tracker.DB_NAME)
+    
+    with pytest.raises(RuntimeError):
+        with tracker.app.test_request_context('/'):
+            tracker.get_ro_conn(db_path)
+            idle, created = ro_pool_idle(tracker)
+            assert idle == created - 1
+            raise RuntimeError("route failed")
+    
+    idle, created = ro_pool_idle(tracker)
+    assert idle == created
+
+
+def test_json_responses_match_flask_default_provider(tracker):
+    """jsonify() keeps Flask's wire format: sorted keys and HTTP-date datetimes."""
+    from datetime import date, datetime
+    from flask import jsonify
+    from flask.json.provider import DefaultJSONProvider
+    
+    payload = {'vessel': 'MAERSK ESSEX', 'mmsi': 235000001,
+               'last_seen': datetime(2026, 10, 17, 12, 30, 0), 'reported': date(2026, 1, 2)}
+    
+    with tracker.app.app_context():
+        body = jsonify(payload).get_data(as_text=True).strip()
+    
+    expected = DefaultJSONProvider(tracker.app).dumps(payload, separators=(',', ':'))
+    assert body == expected
+    assert '"last_seen":"Sat, 17 Oct 2026 12:30:00 GMT"' in body
+
+
+def test_close_pools_closes_idle_connections(tracker, client):
+    """close_pools() (run before forking workers) closes pooled connections; pools reopen on demand."""
+    pool = tracker.get_pool(Path(tracker.DB_NAME))
+    with pool.acquire() as conn:
+        pass
+    
+    tracker.close_pools()
+    
+    assert tracker._pools == {}
+    assert pool._created == 0
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute('SELECT 1')
+    assert client.get('/ships/api/database/vessels').status_code == 200
+
+
+def test_flush_position_buffer_writes_queued_rows(tracker, monkeypatch):
+    """Positions still queued at shutdown are written by flush_position_buffer()."""
+    monkeypatch.setattr(tracker, '_writer_conn', None)
+    tracker._position_queue.put_nowait((235000001, 51.9, 4.1, 12.5, 90.0, '2026-10-17T12:00:00'))
+    tracker._position_queue.put_nowait((235000001, 51.95, 4.2, 12.5, 90.0, '2026-10-17T12:01:00'))
+    
+    tracker.flush_position_buffer()
+    tracker._writer_conn.close()
+    
+    assert tracker._position_queue.empty()
+    conn = sqlite3.connect(tracker.DB_NAME)
+    count = conn.execute('SELECT COUNT(*) FROM vessel_positions WHERE mmsi = 235000001').fetchone()[0]
+    conn.close()
+    assert count == 2
+
+
+def test_route_text_fallback_cutoff_handles_both_timestamp_forms(tracker, client, monkeypatch):
+    """Without ts_epoch, the hours cutoff is exact for ISO 'T' and space-separated timestamps."""
+    from datetime import datetime, timedelta
+    monkeypatch.setattr(tracker, '_epoch_ready', set())
+    
+    # Put the cutoff near midday so earlier rows on the same date exist
+    now = datetime.utcnow().replace(microsecond=0)
+    hours = (now.hour - 12) % 24 + 24
+    cutoff = now - timedelta(hours=hours)
+    day_start = cutoff.replace(hour=0, minute=0, second=1)
+    timestamps = [
+        day_start.isoformat(),                                        # stale, same date as cutoff
+        day_start.isoformat(sep=' '),                                 # stale, space form
+        (cutoff + timedelta(hours=1)).isoformat(sep=' ') + '.5 +0000 UTC',
+        (cutoff + timedelta(hours=2)).isoformat(),
+    ]
+    conn = sqlite3.connect(tracker.DB_NAME)
+    conn.executemany(
+        "INSERT INTO vessel_positions (mmsi, latitude, longitude, sog, cog, timestamp) "
+        "VALUES (235000001, 51.9, 4.1, 0, 0, ?)",
+        [(ts,) for ts in timestamps]
+    )
+    conn.commit()
+    conn.close()
+    
+    response = client.get('/ships/api/vessel/235000001/route', query_string={'hours': hours})
+    
+    assert response.status_code == 200
+    assert [point['timestamp'] for point in response.get_json()] == timestamps[2:]
+
+
+def test_sql_console_hides_ts_epoch_unless_named(tracker, client):
+    """The generated ts_epoch column stays out of SELECT * results and CSV exports."""
+    conn = sqlite3.connect(tracker.DB_NAME)
+    conn.execute(
+        "INSERT INTO vessel_positions (mmsi, latitude, longitude, sog, cog, heading, timestamp) "
+        "VALUES (235000001, 51.9, 4.1, 0, 0, 0, '2026-10-17T12:00:00')"
+    )
+    conn.commit()
+    conn.close()
+    
+    response = client.post('/ships/api/sql/query', json={'query': 'SELECT * FROM vessel_positions'})
+    body = response.get_json()
+    assert body['columns'] == ['id', 'mmsi', 'latitude', 'longitude', 'sog', 'cog', 'heading', 'timestamp']
+    assert body['rows'][0][-1] == '2026-10-17T12:00:00'
+    
+    export = client.post('/ships/api/sql/export', json={'query': 'SELECT * FROM vessel_positions'})
+    assert export.get_data(as_text=True).splitlines()[0] == 'id,mmsi,latitude,longitude,sog,cog,heading,timestamp'
+    
+    assert sql_query(client, 'SELECT ts_epoch FROM vessel_positions') == [[1792238400]]